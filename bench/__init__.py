@@ -0,0 +1 @@
+"""Бенчмарки базы данных ключ-значение."""
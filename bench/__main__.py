@@ -0,0 +1,118 @@
+"""Запуск набора нагрузок: python -m bench [--output FILE] [--baseline FILE].
+
+Печатает медианы ops/s и перцентилей задержки по нескольким повторам,
+разброс ops/s между повторами и пиковую память каждой нагрузки,
+сохраняет результаты в JSON и при заданном базовом прогоне завершается
+с кодом 1, если найдены регрессии (допуск — threshold плюс разброс
+показателя в обоих прогонах).
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+from bench.suite import (
+    DEFAULT_THRESHOLD,
+    DRIVERS,
+    WORKLOADS,
+    compare,
+    run_workload,
+)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench", description=__doc__
+    )
+    parser.add_argument(
+        "--workloads",
+        nargs="+",
+        choices=[workload.name for workload in WORKLOADS],
+        help="запустить только эти нагрузки",
+    )
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="число замеряемых прогонов"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="число прогонов для прогрева"
+    )
+    parser.add_argument(
+        "--driver",
+        choices=DRIVERS,
+        default="command",
+        help="выполнять через process_command или методами Database",
+    )
+    parser.add_argument(
+        "--metrics", action="store_true", help="включить метрики команд"
+    )
+    parser.add_argument("--output", metavar="FILE", help="сохранить JSON")
+    parser.add_argument(
+        "--baseline", metavar="FILE", help="JSON прошлого прогона"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="допустимое ухудшение относительно базового прогона "
+        "(к нему добавляется разброс между повторами)",
+    )
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(
+        f"{'workload':<20} {'ops/s':>12} {'spread':>7} {'p50 us':>8} "
+        f"{'p99 us':>8} {'p99.9 us':>9} {'peak MB':>8}"
+    )
+    for workload in WORKLOADS:
+        if args.workloads and workload.name not in args.workloads:
+            continue
+        metrics = run_workload(
+            workload,
+            args.seed,
+            args.scale,
+            args.metrics,
+            args.repeat,
+            args.warmup,
+            args.driver,
+        )
+        results[workload.name] = metrics
+        print(
+            f"{workload.name:<20} {metrics['ops_per_sec']:>12,.0f} "
+            f"{metrics['ops_per_sec_spread']:>7.1%} "
+            f"{metrics['p50_us']:>8.1f} {metrics['p99_us']:>8.1f} "
+            f"{metrics['p999_us']:>9.1f} {metrics['peak_memory_mb']:>8.1f}"
+        )
+
+    if args.output:
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "scale": args.scale,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "driver": args.driver,
+            "results": results,
+        }
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            report = json.load(baseline_file)
+        if report.get("driver", "command") != args.driver:
+            print(f"baseline was measured with --driver {report['driver']}")
+            return 2
+        baseline = report["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
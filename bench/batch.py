@@ -0,0 +1,61 @@
+"""Сравнение интерактивного цикла и пакетного режима main.py.
+
+Генерирует файл команд (SET, GET, COUNTS, UNSET, транзакции) и выполняет
+его через stdin обоими способами.
+
+Запуск: python -m bench.batch [--lines N]
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def generate(path: str, lines: int) -> None:
+    rng = random.Random(0)
+    with open(path, "w") as commands:
+        for i in range(lines):
+            key = f"key{rng.randrange(100_000)}"
+            kind = i % 10
+            if kind < 4:
+                commands.write(f"SET {key} {rng.randrange(1000)}\n")
+            elif kind < 8:
+                commands.write(f"GET {key}\n")
+            elif kind == 8:
+                commands.write(f"COUNTS {rng.randrange(1000)}\n")
+            else:
+                commands.write(f"UNSET {key}\n")
+
+
+def run(path: str, *options: str) -> float:
+    started = time.perf_counter()
+    with open(path) as stdin:
+        subprocess.run(
+            [sys.executable, "main.py", *options],
+            stdin=stdin,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "commands.txt")
+        generate(path, args.lines)
+        for name, options in (("interactive", ()), ("batch", ("--batch",))):
+            elapsed = run(path, *options)
+            print(
+                f"{name:>11}: {elapsed:.2f}s, "
+                f"{args.lines / elapsed:,.0f} lines/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
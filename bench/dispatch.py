@@ -0,0 +1,125 @@
+"""Накладные расходы разбора и диспетчеризации команд.
+
+Выполняет одни и те же строки команд (SET, GET, COUNTS, UNSET по
+небольшому набору ключей) несколькими способами и печатает время на
+команду и накладные расходы сверх прямых вызовов методов Database:
+
+    direct            — методы Database по заранее разобранным строкам;
+    execute           — прежний путь: strip, split, срез аргументов,
+                        create_command и execute с validate_args;
+    process_command   — по одной строке;
+    process_commands  — пакетом.
+
+Затем сравнивает process_commands без кэша и с кэшем строк на потоке,
+в котором повторяются строки из небольшого набора.
+
+Запуск: python -m bench.dispatch [--lines N] [--keys N] [--repeat N]
+                             [--pool N]
+"""
+import argparse
+import random
+import time
+
+from commands import CommandFactory, process_command, process_commands
+from database import Database
+
+
+def generate(lines: int, keys: int) -> list[str]:
+    rng = random.Random(0)
+    commands = []
+    for i in range(lines):
+        key = f"key{rng.randrange(keys)}"
+        kind = i % 10
+        if kind < 4:
+            commands.append(f"SET {key} {rng.randrange(100)}")
+        elif kind < 8:
+            commands.append(f"GET {key}")
+        elif kind == 8:
+            commands.append(f"COUNTS {rng.randrange(100)}")
+        else:
+            commands.append(f"UNSET {key}")
+    return commands
+
+
+def run_direct(db: Database, parsed: list[list[str]]) -> None:
+    for name, *args in parsed:
+        if name == "SET":
+            db.set_value(args[0], args[1])
+        elif name == "GET":
+            db.get_value(args[0])
+        elif name == "COUNTS":
+            str(db.count_value(args[0]))
+        else:
+            db.unset_value(args[0])
+
+
+def run_execute(db: Database, lines: list[str]) -> None:
+    for line in lines:
+        parts = line.strip().split()
+        args = parts[1:] if len(parts) > 1 else []
+        CommandFactory.create_command(parts[0]).execute(db, args)
+
+
+def run_process_command(db: Database, lines: list[str]) -> None:
+    for line in lines:
+        process_command(db, line)
+
+
+def measure(run, argument, repeat: int) -> float:
+    """Возвращает лучшее время прогона на свежей базе, в секундах."""
+    best = float("inf")
+    for _ in range(repeat):
+        db = Database()
+        started = time.perf_counter()
+        run(db, argument)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--pool", type=int, default=500)
+    args = parser.parse_args()
+    lines = generate(args.lines, args.keys)
+    parsed = [line.split() for line in lines]
+
+    results = {
+        "direct": measure(run_direct, parsed, args.repeat),
+        "execute": measure(run_execute, lines, args.repeat),
+        "process_command": measure(run_process_command, lines, args.repeat),
+        "process_commands": measure(
+            lambda db, lines: list(process_commands(db, lines)),
+            lines,
+            args.repeat,
+        ),
+    }
+    floor = results["direct"]
+    for name, elapsed in results.items():
+        per_command = elapsed / args.lines * 1e9
+        overhead = (elapsed - floor) / args.lines * 1e9
+        print(
+            f"{name:>24}: {per_command:7.0f} ns/command, "
+            f"overhead {overhead:5.0f} ns"
+        )
+
+    rng = random.Random(1)
+    pool = generate(args.pool, args.keys)
+    repeated = [rng.choice(pool) for _ in range(args.lines)]
+    print(f"repeated lines (pool of {args.pool}):")
+    for cache_size in (0, 4096):
+        elapsed = measure(
+            lambda db, lines: list(process_commands(db, lines, cache_size)),
+            repeated,
+            args.repeat,
+        )
+        print(
+            f"{'cache_size=' + str(cache_size):>24}: "
+            f"{elapsed / args.lines * 1e9:7.0f} ns/command"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Память на ключ при обычном хранении значений и в режиме intern_values.
+
+Ключи и значения разбираются из строк команд, как в process_command,
+поэтому одинаковые значения приходят разными объектами строк.
+
+Запуск: python -m bench.memory [--keys N] [--values M]
+"""
+import argparse
+import tracemalloc
+
+from database import Database
+
+
+def measure(keys: int, values: int, intern_values: bool) -> float:
+    """Возвращает прирост памяти на один ключ в байтах."""
+    tracemalloc.start()
+    db = Database(intern_values=intern_values)
+    for i in range(keys):
+        key, value = f"user:{i}:session value{i % values}".split()
+        db.set_value(key, value)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return used / keys
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--values", type=int, default=1000)
+    args = parser.parse_args()
+    for intern_values in (False, True):
+        per_key = measure(args.keys, args.values, intern_values)
+        name = "intern_values" if intern_values else "plain"
+        print(f"{name:>13}: {per_key:.1f} bytes/key")
+
+
+if __name__ == "__main__":
+    main()
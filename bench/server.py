@@ -0,0 +1,90 @@
+"""Нагрузочный тест TCP-сервера: операций в секунду и задержки p50/p99.
+
+Запускает server.py в отдельном процессе и подключает к нему 1, 10 и 100
+клиентов, каждый из которых по очереди отправляет SET и GET.
+
+Запуск: python -m bench.server [--requests N] [--clients 1 10 100]
+"""
+import argparse
+import asyncio
+import random
+import socket
+import subprocess
+import sys
+import time
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Возвращает перцентиль отсортированной выборки."""
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+async def run_client(
+    port: int, requests: int, seed: int, latencies: list[float]
+) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    rng = random.Random(seed)
+    for i in range(requests):
+        key = f"key{rng.randrange(10000)}"
+        if i % 2:
+            command = f"GET {key}\n"
+        else:
+            command = f"SET {key} {rng.randrange(100)}\n"
+        started = time.perf_counter()
+        writer.write(command.encode())
+        await reader.readline()
+        latencies.append(time.perf_counter() - started)
+    writer.write(b"END\n")
+    writer.close()
+
+
+async def run_load(port: int, clients: int, requests: int) -> None:
+    latencies: list[float] = []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            run_client(port, requests // clients, seed, latencies)
+            for seed in range(clients)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    print(
+        f"{clients:>4} clients: {len(latencies) / elapsed:10,.0f} ops/s, "
+        f"p50 {percentile(latencies, 0.5) * 1e3:.3f} ms, "
+        f"p99 {percentile(latencies, 0.99) * 1e3:.3f} ms"
+    )
+
+
+def wait_for_port(port: int, timeout: float = 10) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    server = subprocess.Popen(
+        [sys.executable, "server.py", "--port", str(args.port)]
+    )
+    try:
+        wait_for_port(args.port)
+        for clients in args.clients:
+            asyncio.run(run_load(args.port, clients, args.requests))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
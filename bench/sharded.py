@@ -0,0 +1,42 @@
+"""Масштабирование базы данных с шардами на 1, 2, 4 и 8 процессах.
+
+Нагрузка: пакеты MSET и MGET по batch ключей и COUNTS, рассылаемые
+по всем шардам. Пакеты делятся между шардами и выполняются параллельно.
+
+Запуск: python -m bench.sharded [--keys N] [--batch B]
+"""
+import argparse
+import os
+import time
+
+from sharded import ShardedDatabase
+
+
+def run(shards: int, keys: int, batch: int) -> float:
+    """Возвращает число обработанных ключей в секунду."""
+    names = [f"user:{i}:session" for i in range(keys)]
+    with ShardedDatabase(shards=shards) as db:
+        started = time.perf_counter()
+        for start in range(0, keys, batch):
+            chunk = names[start:start + batch]
+            db.set_values((key, str(i % 100)) for i, key in enumerate(chunk))
+            db.get_values(chunk)
+            db.count_value("42")
+        elapsed = time.perf_counter() - started
+    return 2 * keys / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=400_000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    print(f"CPUs: {os.cpu_count()}")
+    for shards in args.shards:
+        rate = run(shards, args.keys, args.batch)
+        print(f"{shards} shards: {rate:12,.0f} keys/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Скорость записи и загрузки снимка против воспроизведения журнала.
+
+Запуск: python -m bench.snapshot [--keys N] [--values M]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from database import Database
+from wal import FSYNC_NEVER, WriteAheadLog
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=5_000_000)
+    parser.add_argument("--values", type=int, default=5000)
+    args = parser.parse_args()
+    db = Database()
+    for i in range(args.keys):
+        db.set_value(f"user:{i}:session", f"value{i % args.values}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "db.snapshot")
+        started = time.perf_counter()
+        db.save_snapshot(path)
+        saved = time.perf_counter() - started
+        size = os.path.getsize(path) / 2**20
+        print(f"save: {saved:.2f}s, {size:.1f} MiB")
+        started = time.perf_counter()
+        Database().load_snapshot(path)
+        print(f"load: {time.perf_counter() - started:.2f}s")
+
+        wal = WriteAheadLog(os.path.join(directory, "db.wal"), FSYNC_NEVER)
+        wal.append(db.data.items())
+        started = time.perf_counter()
+        Database().attach_log(wal)
+        print(f"log replay: {time.perf_counter() - started:.2f}s")
+        wal.close()
+
+
+if __name__ == "__main__":
+    main()
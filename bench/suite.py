@@ -0,0 +1,331 @@
+"""Набор нагрузок для измерения производительности команд.
+
+Каждая нагрузка заранее генерирует строки команд и начальные данные,
+затем выполняет команды через process_command или прямыми вызовами
+методов Database (строки разбираются до замера), измеряя задержку
+каждой. Нагрузка выполняется сначала без замера для прогрева, затем
+несколько раз на свежей базе; в отчёт попадают медианы показателей
+и их разброс между повторами. Пиковая память измеряется отдельным
+прогоном под tracemalloc, чтобы трассировка не искажала время.
+"""
+import bisect
+import itertools
+import random
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+
+from commands import process_command
+from database import Database
+
+
+class Workload:
+    """Нагрузка: начальные данные и последовательность команд.
+
+    Атрибуты:
+        name: Имя нагрузки в отчёте.
+        description: Краткое описание.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        generate: Callable[[random.Random, int], tuple[dict, list[str]]],
+    ) -> None:
+        self.name = name
+        self.description = description
+        self._generate = generate
+
+    def generate(self, seed: int, scale: int) -> tuple[dict, list[str]]:
+        """Возвращает начальные данные и строки команд."""
+        return self._generate(random.Random(seed), scale)
+
+
+class Zipf:
+    """Генератор номеров ключей с распределением Ципфа."""
+
+    def __init__(self, size: int, exponent: float = 1.1) -> None:
+        weights = (1 / rank**exponent for rank in range(1, size + 1))
+        self._cumulative = list(itertools.accumulate(weights))
+
+    def sample(self, rng: random.Random) -> int:
+        point = rng.random() * self._cumulative[-1]
+        return bisect.bisect(self._cumulative, point)
+
+
+def _preload(keys: int, values: int) -> dict[str, str]:
+    return {f"key:{i}": f"v{i % values}" for i in range(keys)}
+
+
+def read_heavy(rng: random.Random, scale: int) -> tuple[dict, list[str]]:
+    keys = 10_000 * scale
+    commands = []
+    for _ in range(50_000 * scale):
+        key = f"key:{rng.randrange(keys)}"
+        if rng.random() < 0.9:
+            commands.append(f"GET {key}")
+        else:
+            commands.append(f"SET {key} v{rng.randrange(100)}")
+    return _preload(keys, 100), commands
+
+
+def write_heavy(rng: random.Random, scale: int) -> tuple[dict, list[str]]:
+    keys = 10_000 * scale
+    commands = []
+    for _ in range(50_000 * scale):
+        key = f"key:{rng.randrange(keys)}"
+        roll = rng.random()
+        if roll < 0.7:
+            commands.append(f"SET {key} v{rng.randrange(100)}")
+        elif roll < 0.9:
+            commands.append(f"UNSET {key}")
+        else:
+            commands.append(f"GET {key}")
+    return _preload(keys, 100), commands
+
+
+def zipfian(rng: random.Random, scale: int) -> tuple[dict, list[str]]:
+    keys = 10_000 * scale
+    zipf = Zipf(keys)
+    commands = []
+    for _ in range(50_000 * scale):
+        key = f"key:{zipf.sample(rng)}"
+        if rng.random() < 0.5:
+            commands.append(f"GET {key}")
+        else:
+            commands.append(f"SET {key} v{rng.randrange(100)}")
+    return _preload(keys, 100), commands
+
+
+def nested_transactions(
+    rng: random.Random, scale: int
+) -> tuple[dict, list[str]]:
+    keys = 10_000 * scale
+    commands = []
+    for _ in range(50 * scale):
+        for _ in range(10):
+            commands.append("BEGIN")
+            for _ in range(50):
+                key = f"key:{rng.randrange(keys)}"
+                commands.append(f"SET {key} v{rng.randrange(100)}")
+                commands.append(f"GET {key}")
+            commands.append(f"COUNTS v{rng.randrange(100)}")
+        for depth in range(10):
+            commands.append("COMMIT" if depth % 3 else "ROLLBACK")
+    return _preload(keys, 100), commands
+
+
+def counts_find(rng: random.Random, scale: int) -> tuple[dict, list[str]]:
+    keys = 100_000 * scale
+    commands = []
+    for _ in range(2_000 * scale):
+        value = f"v{rng.randrange(1000)}"
+        roll = rng.random()
+        if roll < 0.6:
+            commands.append(f"COUNTS {value}")
+        elif roll < 0.8:
+            commands.append(f"FIND {value}")
+        else:
+            commands.append(f"SET key:{rng.randrange(keys)} {value}")
+    return _preload(keys, 1000), commands
+
+
+def multi_key(rng: random.Random, scale: int) -> tuple[dict, list[str]]:
+    keys = 10_000 * scale
+    commands = []
+    for _ in range(1_000 * scale):
+        batch = [f"key:{rng.randrange(keys)}" for _ in range(100)]
+        if rng.random() < 0.5:
+            pairs = (f"{key} v{rng.randrange(100)}" for key in batch)
+            commands.append("MSET " + " ".join(pairs))
+        else:
+            commands.append("MGET " + " ".join(batch))
+    return _preload(keys, 100), commands
+
+
+WORKLOADS = [
+    Workload("read_heavy", "90% GET, 10% SET", read_heavy),
+    Workload("write_heavy", "70% SET, 20% UNSET, 10% GET", write_heavy),
+    Workload("zipfian", "50% GET, 50% SET, ключи по Ципфу", zipfian),
+    Workload(
+        "nested_transactions",
+        "10 уровней BEGIN с SET/GET/COUNTS, COMMIT и ROLLBACK",
+        nested_transactions,
+    ),
+    Workload("counts_find", "COUNTS/FIND на 100k ключей", counts_find),
+    Workload("multi_key", "MSET/MGET по 100 ключей", multi_key),
+]
+
+
+def load(data: dict[str, str], metrics: bool = False) -> Database:
+    db = Database()
+    db.metrics.enabled = metrics
+    db.set_values(data.items())
+    return db
+
+
+def percentile(samples: list[int], fraction: float) -> int:
+    """Возвращает перцентиль отсортированной выборки."""
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def direct_calls(db: Database, commands: list[str]) -> Iterator[tuple]:
+    """Разбирает строки команд в вызовы методов db: (метод, аргументы)."""
+    for command in commands:
+        name, *args = command.split()
+        if name == "GET":
+            yield db.get_value, args
+        elif name == "SET":
+            yield db.set_value, args
+        elif name == "UNSET":
+            yield db.unset_value, args
+        elif name == "COUNTS":
+            yield db.count_value, args
+        elif name == "FIND":
+            yield db.find_keys, args
+        elif name == "MGET":
+            yield db.get_values, [args]
+        elif name == "MSET":
+            yield db.set_values, [list(zip(args[::2], args[1::2]))]
+        elif name == "BEGIN":
+            yield db.begin_transaction, args
+        elif name == "COMMIT":
+            yield db.commit_transaction, args
+        elif name == "ROLLBACK":
+            yield db.rollback_transaction, args
+        else:
+            raise ValueError(f"No direct call for {name}")
+
+
+DRIVERS = ("command", "database")
+
+# Допуск по умолчанию для compare: меньшие изменения медиан между
+# прогонами на одной машине — обычный шум.
+DEFAULT_THRESHOLD = 0.2
+# Рост p99 меньше этого (в микросекундах) не считается регрессией:
+# такие задержки сравнимы с накладными расходами самого замера.
+P99_NOISE_US = 1.0
+
+
+def _calls(db: Database, commands: list[str], driver: str) -> Iterator[tuple]:
+    """Перечисляет вызовы для выполнения нагрузки выбранным способом."""
+    if driver == "database":
+        return direct_calls(db, commands)
+    return ((process_command, (db, command)) for command in commands)
+
+
+def _measure(
+    data: dict[str, str], commands: list[str], metrics: bool, driver: str
+) -> tuple[float, list[int]]:
+    """Выполняет нагрузку на свежей базе: время (с) и задержки (нс)."""
+    db = load(data, metrics)
+    calls = list(_calls(db, commands, driver))
+    clock = time.perf_counter_ns
+    latencies = []
+    started = clock()
+    for function, args in calls:
+        before = clock()
+        function(*args)
+        latencies.append(clock() - before)
+    elapsed = (clock() - started) / 1e9
+    latencies.sort()
+    return elapsed, latencies
+
+
+def _spread(values: list[float]) -> float:
+    """Относительный разброс значений: медиана отклонений от медианы,
+    делённая на медиану. В отличие от размаха не зависит от единичных
+    выбросов.
+    """
+    median = statistics.median(values)
+    if not median:
+        return 0.0
+    return statistics.median(abs(value - median) for value in values) / median
+
+
+def run_workload(
+    workload: Workload,
+    seed: int = 0,
+    scale: int = 1,
+    metrics: bool = False,
+    repeat: int = 5,
+    warmup: int = 1,
+    driver: str = "command",
+) -> dict[str, float]:
+    """Выполняет нагрузку и возвращает медианы её показателей.
+
+    Первые warmup прогонов не учитываются, затем нагрузка выполняется
+    repeat раз. *_spread — относительный разброс показателя между
+    повторами, по нему compare отличает регрессию от шума.
+    """
+    data, commands = workload.generate(seed, scale)
+    for _ in range(warmup):
+        _measure(data, commands, metrics, driver)
+    runs = {"ops_per_sec": [], "p50_us": [], "p99_us": [], "p999_us": []}
+    max_us = 0.0
+    for _ in range(repeat):
+        elapsed, latencies = _measure(data, commands, metrics, driver)
+        runs["ops_per_sec"].append(len(commands) / elapsed)
+        runs["p50_us"].append(percentile(latencies, 0.5) / 1e3)
+        runs["p99_us"].append(percentile(latencies, 0.99) / 1e3)
+        runs["p999_us"].append(percentile(latencies, 0.999) / 1e3)
+        max_us = max(max_us, latencies[-1] / 1e3)
+
+    tracemalloc.start()
+    db = load(data, metrics)
+    for function, args in _calls(db, commands, driver):
+        function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result = {"ops": len(commands)}
+    for name, values in runs.items():
+        result[name] = statistics.median(values)
+    result["ops_per_sec_spread"] = _spread(runs["ops_per_sec"])
+    result["p99_us_spread"] = _spread(runs["p99_us"])
+    result["max_us"] = max_us
+    result["peak_memory_mb"] = peak / 2**20
+    return result
+
+
+def compare(
+    results: dict[str, dict],
+    baseline: dict[str, dict],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[str]:
+    """Возвращает описания регрессий относительно базового прогона.
+
+    Регрессия — падение медианы ops/s или рост медианы p99 больше, чем
+    на threshold плюс удвоенный разброс показателя между повторами
+    в обоих прогонах: шумная нагрузка получает больший допуск. Рост p99
+    меньше P99_NOISE_US не учитывается.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        tolerance = threshold + _noise(metrics, previous, "ops_per_sec")
+        if metrics["ops_per_sec"] < previous["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: ops/s {previous['ops_per_sec']:,.0f} -> "
+                f"{metrics['ops_per_sec']:,.0f}"
+            )
+        tolerance = threshold + _noise(metrics, previous, "p99_us")
+        limit = max(
+            previous["p99_us"] * (1 + tolerance),
+            previous["p99_us"] + P99_NOISE_US,
+        )
+        if metrics["p99_us"] > limit:
+            regressions.append(
+                f"{name}: p99 {previous['p99_us']:.1f}us -> "
+                f"{metrics['p99_us']:.1f}us"
+            )
+    return regressions
+
+
+def _noise(metrics: dict, previous: dict, name: str) -> float:
+    """Удвоенный суммарный разброс показателя в двух прогонах."""
+    key = f"{name}_spread"
+    return 2 * (metrics.get(key, 0.0) + previous.get(key, 0.0))
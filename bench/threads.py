@@ -0,0 +1,75 @@
+"""Пропускная способность чтения ThreadSafeDatabase по числу потоков.
+
+Читатели выполняют GET без блокировки и транзакции со снимком,
+один писатель параллельно выполняет SET. На сборках CPython с GIL
+чтение не масштабируется по ядрам, но и не ждёт писателя.
+
+Запуск: python -m bench.threads [--seconds S] [--threads 1 2 4 8]
+"""
+import argparse
+import sys
+import threading
+import time
+
+from threadsafe import ThreadSafeDatabase
+
+KEYS = 10_000
+
+
+def reader(
+    db: ThreadSafeDatabase, stop: threading.Event, counts: list
+) -> None:
+    session = db.session()
+    reads = 0
+    while not stop.is_set():
+        session.begin_transaction()
+        for i in range(0, KEYS, 100):
+            session.get_value(f"key{i}")
+        session.rollback_transaction()
+        for i in range(0, KEYS, 100):
+            session.get_value(f"key{i}")
+        reads += 2 * KEYS // 100
+    counts.append(reads)
+
+
+def writer(db: ThreadSafeDatabase, stop: threading.Event) -> None:
+    session = db.session()
+    i = 0
+    while not stop.is_set():
+        session.set_value(f"key{i % KEYS}", str(i))
+        i += 1
+
+
+def run(threads: int, seconds: float) -> float:
+    db = ThreadSafeDatabase()
+    db.set_values((f"key{i}", str(i)) for i in range(KEYS))
+    stop = threading.Event()
+    counts: list[int] = []
+    workers = [
+        threading.Thread(target=reader, args=(db, stop, counts))
+        for _ in range(threads)
+    ]
+    workers.append(threading.Thread(target=writer, args=(db, stop)))
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=2)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"GIL enabled: {gil}")
+    for threads in args.threads:
+        rate = run(threads, args.seconds)
+        print(f"{threads} readers: {rate:12,.0f} GET/s")
+
+
+if __name__ == "__main__":
+    main()
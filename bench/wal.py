@@ -0,0 +1,43 @@
+"""Пропускная способность SET с журналом в разных режимах fsync.
+
+Запуск: python -m bench.wal [--ops N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from database import Database
+from wal import FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER, WriteAheadLog
+
+
+def run(ops: int, fsync: str | None, directory: str) -> float:
+    """Выполняет ops команд SET и возвращает число операций в секунду."""
+    db = Database()
+    wal = None
+    if fsync is not None:
+        wal = WriteAheadLog(
+            os.path.join(directory, f"{fsync}.wal"), fsync, interval_ms=100
+        )
+        db.subscribe(wal.append)
+    started = time.perf_counter()
+    for i in range(ops):
+        db.set_value(f"key{i % 10000}", str(i))
+    if wal is not None:
+        wal.close()
+    return ops / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=100_000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        for fsync in (None, FSYNC_NEVER, FSYNC_INTERVAL, FSYNC_ALWAYS):
+            ops = args.ops if fsync != FSYNC_ALWAYS else args.ops // 20
+            rate = run(ops, fsync, directory)
+            print(f"{fsync or 'no wal':>10}: {rate:12,.0f} SET/s ({ops} ops)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,27 @@
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
 
-from database import Database
+from database import Database, TransactionConflict
 
 
 class Command(ABC):
-    """Абстрактный базовый класс для всех команд."""
+    """Абстрактный базовый класс для всех команд.
+
+    Если задано arity, то при таком числе аргументов команда выполняется
+    методом fast без отдельной проверки аргументов.
+    """
+
+    __slots__ = ()
+    arity: int | None = None
+
+    def fast(self, db: Database, parts: list[str]) -> str | None:
+        """Выполняет команду с arity аргументами.
+
+        parts — слова строки команды, первое из которых — имя команды;
+        execute после проверки аргументов вызывает fast с None вместо имени.
+        """
+        return self.execute(db, parts[1:])
 
     @abstractmethod
     def execute(self, db: Database, args: list[str]) -> str | None:
@@ -17,102 +34,488 @@ class Command(ABC):
         pass
 
 
+def parse_int(value: str) -> int | None:
+    """Разбирает целое число или возвращает None."""
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def fits_float(value: int) -> bool:
+    """Проверяет, представимо ли целое число в виде float."""
+    try:
+        float(value)
+    except OverflowError:
+        return False
+    return True
+
+
 class SetCommand(Command):
+    __slots__ = ()
+    arity = 2
+
+    def fast(self, db: Database, parts: list[str]) -> str | None:
+        db.set_value(parts[1], parts[2])
+        return None
+
     def validate_args(self, args: list[str]) -> bool:
+        if len(args) == 4:
+            seconds = parse_int(args[3])
+            return args[2].upper() == "EX" and seconds is not None
         return len(args) == 2
 
     def execute(self, db: Database, args: list[str]) -> str | None:
         if not self.validate_args(args):
-            return "ERROR: SET requires KEY VALUE"
-        key, value = args
-        db.set_value(key, value)
-        return None
+            return "ERROR: SET requires KEY VALUE [EX SECONDS]"
+        if len(args) == 4:
+            seconds = parse_int(args[3])
+            if seconds <= 0 or not fits_float(seconds):
+                return "ERROR: invalid expire time in SET"
+            db.set_value(args[0], args[1], ttl=seconds)
+            return None
+        return self.fast(db, [None, *args])
 
 
 class GetCommand(Command):
+    __slots__ = ()
+    arity = 1
+
+    def fast(self, db: Database, parts: list[str]) -> str | None:
+        return db.get_value(parts[1])
+
     def validate_args(self, args: list[str]) -> bool:
         return len(args) == 1
 
     def execute(self, db: Database, args: list[str]) -> str | None:
         if not self.validate_args(args):
             return "ERROR: GET requires KEY"
-        return db.get_value(args[0])
+        return self.fast(db, [None, *args])
 
 
 class UnsetCommand(Command):
+    __slots__ = ()
+    arity = 1
+
+    def fast(self, db: Database, parts: list[str]) -> str | None:
+        db.unset_value(parts[1])
+        return None
+
     def validate_args(self, args: list[str]) -> bool:
         return len(args) == 1
 
     def execute(self, db: Database, args: list[str]) -> str | None:
         if not self.validate_args(args):
             return "ERROR: UNSET requires KEY"
-        db.unset_value(args[0])
+        return self.fast(db, [None, *args])
+
+
+class MsetCommand(Command):
+    __slots__ = ()
+
+    def validate_args(self, args: list[str]) -> bool:
+        return len(args) > 0 and len(args) % 2 == 0
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: MSET requires KEY VALUE [KEY VALUE ...]"
+        db.set_values(zip(args[::2], args[1::2]))
         return None
 
 
+class MgetCommand(Command):
+    __slots__ = ()
+
+    def validate_args(self, args: list[str]) -> bool:
+        return len(args) > 0
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: MGET requires KEY [KEY ...]"
+        return " ".join(db.get_values(args))
+
+
+class MunsetCommand(Command):
+    __slots__ = ()
+
+    def validate_args(self, args: list[str]) -> bool:
+        return len(args) > 0
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: MUNSET requires KEY [KEY ...]"
+        db.unset_values(args)
+        return None
+
+
+class ExpireCommand(Command):
+    __slots__ = ()
+
+    def validate_args(self, args: list[str]) -> bool:
+        return len(args) == 2 and parse_int(args[1]) is not None
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: EXPIRE requires KEY SECONDS"
+        seconds = parse_int(args[1])
+        if not fits_float(seconds):
+            return "ERROR: invalid expire time in EXPIRE"
+        return "1" if db.expire(args[0], seconds) else "0"
+
+
+class TtlCommand(Command):
+    __slots__ = ()
+    arity = 1
+
+    def fast(self, db: Database, parts: list[str]) -> str | None:
+        return str(db.ttl(parts[1]))
+
+    def validate_args(self, args: list[str]) -> bool:
+        return len(args) == 1
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: TTL requires KEY"
+        return self.fast(db, [None, *args])
+
+
+def increment(db: Database, key: str, amount: int) -> str:
+    """Увеличивает значение ключа и возвращает ответ команды."""
+    try:
+        return str(db.incr_by(key, amount))
+    except ValueError:
+        return "ERROR: value is not an integer"
+
+
+class IncrCommand(Command):
+    __slots__ = ()
+    arity = 1
+
+    def fast(self, db: Database, parts: list[str]) -> str | None:
+        return increment(db, parts[1], 1)
+
+    def validate_args(self, args: list[str]) -> bool:
+        return len(args) == 1
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: INCR requires KEY"
+        return self.fast(db, [None, *args])
+
+
+class DecrCommand(Command):
+    __slots__ = ()
+    arity = 1
+
+    def fast(self, db: Database, parts: list[str]) -> str | None:
+        return increment(db, parts[1], -1)
+
+    def validate_args(self, args: list[str]) -> bool:
+        return len(args) == 1
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: DECR requires KEY"
+        return self.fast(db, [None, *args])
+
+
+class IncrbyCommand(Command):
+    __slots__ = ()
+
+    def validate_args(self, args: list[str]) -> bool:
+        return len(args) == 2 and parse_int(args[1]) is not None
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: INCRBY requires KEY INCREMENT"
+        return increment(db, args[0], parse_int(args[1]))
+
+
 class CountsCommand(Command):
+    __slots__ = ()
+    arity = 1
+
+    def fast(self, db: Database, parts: list[str]) -> str | None:
+        return str(db.count_value(parts[1]))
+
     def validate_args(self, args: list[str]) -> bool:
         return len(args) == 1
 
     def execute(self, db: Database, args: list[str]) -> str | None:
         if not self.validate_args(args):
             return "ERROR: COUNTS requires VALUE"
-        return str(db.count_value(args[0]))
+        return self.fast(db, [None, *args])
 
 
 class FindCommand(Command):
+    __slots__ = ()
+    arity = 1
+
+    def fast(self, db: Database, parts: list[str]) -> str | None:
+        keys = db.find_keys(parts[1])
+        return " ".join(sorted(keys)) if keys else ""
+
     def validate_args(self, args: list[str]) -> bool:
         return len(args) == 1
 
     def execute(self, db: Database, args: list[str]) -> str | None:
         if not self.validate_args(args):
             return "ERROR: FIND requires VALUE"
-        keys = db.find_keys(args[0])
-        return " ".join(sorted(keys)) if keys else ""
+        return self.fast(db, [None, *args])
+
+
+class KeysCommand(Command):
+    __slots__ = ()
+
+    def validate_args(self, args: list[str]) -> bool:
+        return len(args) == 1
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: KEYS requires PREFIX"
+        return " ".join(db.prefix_keys(args[0]))
+
+
+class RangeCommand(Command):
+    __slots__ = ()
+
+    def validate_args(self, args: list[str]) -> bool:
+        if len(args) == 4:
+            limit = parse_int(args[3])
+            return args[2].upper() == "LIMIT" and limit is not None
+        return len(args) == 2
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: RANGE requires START END [LIMIT N]"
+        limit = parse_int(args[3]) if len(args) == 4 else None
+        if limit is not None and limit < 0:
+            return "ERROR: invalid LIMIT in RANGE"
+        return " ".join(db.range_keys(args[0], args[1], limit))
+
+
+class CountprefixCommand(Command):
+    __slots__ = ()
+
+    def validate_args(self, args: list[str]) -> bool:
+        return len(args) == 1
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: COUNTPREFIX requires PREFIX"
+        return str(db.count_prefix(args[0]))
+
+
+def parse_scan_args(args: list[str]) -> tuple[int, int] | None:
+    """Разбирает аргументы CURSOR [COUNT N] или возвращает None."""
+    if len(args) not in (1, 3):
+        return None
+    try:
+        cursor = int(args[0])
+        count = int(args[2]) if len(args) == 3 else 10
+    except ValueError:
+        return None
+    if len(args) == 3 and args[1].upper() != "COUNT":
+        return None
+    if cursor < 0 or count <= 0:
+        return None
+    return cursor, count
+
+
+def format_page(db: Database, cursor: int, count: int, value=None) -> str:
+    """Возвращает курсор следующей порции и ключи порции через пробел."""
+    try:
+        cursor, keys = db.scan(cursor, count, value)
+    except KeyError:
+        return "ERROR: invalid cursor"
+    return " ".join([str(cursor), *keys])
+
+
+class FindscanCommand(Command):
+    __slots__ = ()
+
+    def validate_args(self, args: list[str]) -> bool:
+        return len(args) > 1 and parse_scan_args(args[1:]) is not None
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: FINDSCAN requires VALUE CURSOR [COUNT N]"
+        cursor, count = parse_scan_args(args[1:])
+        return format_page(db, cursor, count, args[0])
+
+
+class ScanCommand(Command):
+    __slots__ = ()
+
+    def validate_args(self, args: list[str]) -> bool:
+        return parse_scan_args(args) is not None
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: SCAN requires CURSOR [COUNT N]"
+        cursor, count = parse_scan_args(args)
+        return format_page(db, cursor, count)
 
 
 class BeginCommand(Command):
+    __slots__ = ()
+    arity = 0
+
+    def fast(self, db: Database, parts: list[str]) -> str | None:
+        db.begin_transaction()
+        return None
+
     def validate_args(self, args: list[str]) -> bool:
         return len(args) == 0
 
     def execute(self, db: Database, args: list[str]) -> str | None:
         if not self.validate_args(args):
             return "ERROR: BEGIN takes no arguments"
-        db.begin_transaction()
-        return None
+        return self.fast(db, [None, *args])
 
 
 class RollbackCommand(Command):
+    __slots__ = ()
+    arity = 0
+
+    def fast(self, db: Database, parts: list[str]) -> str | None:
+        return None if db.rollback_transaction() else "NO TRANSACTION"
+
     def validate_args(self, args: list[str]) -> bool:
         return len(args) == 0
 
     def execute(self, db: Database, args: list[str]) -> str | None:
         if not self.validate_args(args):
             return "ERROR: ROLLBACK takes no arguments"
-        return None if db.rollback_transaction() else "NO TRANSACTION"
+        return self.fast(db, [None, *args])
 
 
 class CommitCommand(Command):
+    __slots__ = ()
+
     def validate_args(self, args: list[str]) -> bool:
         return len(args) == 0
 
     def execute(self, db: Database, args: list[str]) -> str | None:
         if not self.validate_args(args):
             return "ERROR: COMMIT takes no arguments"
-        return None if db.commit_transaction() else "NO TRANSACTION"
+        try:
+            committed = db.commit_transaction()
+        except TransactionConflict:
+            return "CONFLICT"
+        return None if committed else "NO TRANSACTION"
+
+
+class SnapshotCommand(Command):
+    __slots__ = ()
+
+    def validate_args(self, args: list[str]) -> bool:
+        return len(args) <= 1
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: SNAPSHOT takes optional PATH"
+        path = args[0] if args else None
+        if path is not None and not db.allow_snapshot_path:
+            return "ERROR: SNAPSHOT PATH is not allowed"
+        if db.snapshot_in_progress():
+            return "ERROR: SNAPSHOT already in progress"
+        if not db.save_snapshot(path, background=True):
+            return "ERROR: SNAPSHOT requires PATH"
+        return None
+
+
+class InfoCommand(Command):
+    __slots__ = ()
+
+    def validate_args(self, args: list[str]) -> bool:
+        return len(args) == 0
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: INFO takes no arguments"
+        return " ".join(f"{name}:{value}" for name, value in db.info().items())
+
+
+class StatsCommand(Command):
+    __slots__ = ()
+
+    def validate_args(self, args: list[str]) -> bool:
+        return len(args) <= 1
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: STATS takes optional COMMAND, RESET, ON or OFF"
+        metrics = db.metrics
+        option = args[0].upper() if args else None
+        if option == "RESET":
+            metrics.reset()
+            return None
+        if option in ("ON", "OFF"):
+            metrics.enabled = option == "ON"
+            return None
+        summary = metrics.summary()
+        if option is not None:
+            summary = {option: summary[option]} if option in summary else {}
+        fields = [
+            f"cmdstat_{name.lower()}:"
+            + ",".join(f"{field}={value}" for field, value in stats.items())
+            for name, stats in summary.items()
+        ]
+        if option is None:
+            fields += [
+                f"enabled:{int(metrics.enabled)}",
+                f"transaction_depth:{len(db.transaction_stack)}",
+                f"transaction_depth_max:{metrics.max_depth}",
+                f"frame_size_max:{metrics.max_frame_size}",
+                f"slowlog_len:{len(metrics.slowlog)}",
+            ]
+        return " ".join(fields)
+
+
+class SlowlogCommand(Command):
+    __slots__ = ()
+
+    def validate_args(self, args: list[str]) -> bool:
+        if not args:
+            return True
+        if len(args) != 1:
+            return False
+        if args[0].upper() == "RESET":
+            return True
+        count = parse_int(args[0])
+        return count is not None and count >= 0
+
+    def execute(self, db: Database, args: list[str]) -> str | None:
+        if not self.validate_args(args):
+            return "ERROR: SLOWLOG takes optional COUNT or RESET"
+        slowlog = db.metrics.slowlog
+        if args and args[0].upper() == "RESET":
+            slowlog.clear()
+            return None
+        count = parse_int(args[0]) if args else 10
+        return "; ".join(str(entry) for entry in islice(slowlog, count))
 
 
 class EndCommand(Command):
+    __slots__ = ()
+    arity = 0
+
+    def fast(self, db: Database, parts: list[str]) -> str | None:
+        return "EXIT"
+
     def validate_args(self, args: list[str]) -> bool:
         return len(args) == 0
 
     def execute(self, db: Database, args: list[str]) -> str | None:
         if not self.validate_args(args):
             return "ERROR: END takes no arguments"
-        return "EXIT"
+        return self.fast(db, [None, *args])
 
 
 class UnknownCommand(Command):
+    __slots__ = ("name",)
+
     def __init__(self, name: str):
         self.name = name
 
@@ -124,34 +527,143 @@ class UnknownCommand(Command):
 
 
 class CommandFactory:
-    """Фабрика для создания команд по их имени."""
+    """Фабрика для создания команд по их имени.
+
+    Команды не хранят состояния, поэтому создаются один раз.
+    """
+
+    command_map: dict[str, Command] = {
+        "SET": SetCommand(),
+        "GET": GetCommand(),
+        "UNSET": UnsetCommand(),
+        "MSET": MsetCommand(),
+        "MGET": MgetCommand(),
+        "MUNSET": MunsetCommand(),
+        "EXPIRE": ExpireCommand(),
+        "TTL": TtlCommand(),
+        "INCR": IncrCommand(),
+        "DECR": DecrCommand(),
+        "INCRBY": IncrbyCommand(),
+        "COUNTS": CountsCommand(),
+        "FIND": FindCommand(),
+        "KEYS": KeysCommand(),
+        "RANGE": RangeCommand(),
+        "COUNTPREFIX": CountprefixCommand(),
+        "FINDSCAN": FindscanCommand(),
+        "SCAN": ScanCommand(),
+        "BEGIN": BeginCommand(),
+        "ROLLBACK": RollbackCommand(),
+        "COMMIT": CommitCommand(),
+        "SNAPSHOT": SnapshotCommand(),
+        "INFO": InfoCommand(),
+        "STATS": StatsCommand(),
+        "SLOWLOG": SlowlogCommand(),
+        "END": EndCommand(),
+    }
 
     @staticmethod
     def create_command(command_name: str) -> Command:
-        command_map = {
-            "SET": SetCommand(),
-            "GET": GetCommand(),
-            "UNSET": UnsetCommand(),
-            "COUNTS": CountsCommand(),
-            "FIND": FindCommand(),
-            "BEGIN": BeginCommand(),
-            "ROLLBACK": RollbackCommand(),
-            "COMMIT": CommitCommand(),
-            "END": EndCommand(),
-        }
-        return command_map.get(
-            command_name.upper(), UnknownCommand(command_name)
-        )
+        command = CommandFactory.command_map.get(command_name.upper())
+        if command is None:
+            return UnknownCommand(command_name)
+        return command
+
+
+# Запись таблицы диспетчеризации: имя команды для метрик, команда,
+# число слов строки, при котором работает быстрый путь, и метод fast.
+DispatchEntry = tuple[str, Command, int, Callable]
+
+
+def build_dispatch_table(
+    command_map: dict[str, Command]
+) -> dict[str, DispatchEntry]:
+    """Строит таблицу диспетчеризации по имени команды.
+
+    Имена добавляются в верхнем и нижнем регистре и с заглавной буквы,
+    чтобы обычное написание команды находилось без вызова upper().
+    """
+    table = {}
+    for name, command in command_map.items():
+        words = -1 if command.arity is None else command.arity + 1
+        entry = (name, command, words, command.fast)
+        for spelling in (name, name.lower(), name.capitalize()):
+            table[spelling] = entry
+    return table
+
+
+_dispatch_table = build_dispatch_table(CommandFactory.command_map)
+
+
+def _lookup(verb: str) -> DispatchEntry | None:
+    """Находит запись таблицы для имени команды в любом регистре."""
+    return _dispatch_table.get(verb.upper())
+
+
+def _unknown(db: Database, parts: list[str]) -> str:
+    """Отвечает на неизвестную команду.
+
+    Объект команды создаётся, только если нужно учесть её в метриках.
+    """
+    metrics = db.metrics
+    if metrics.enabled:
+        command = UnknownCommand(parts[0])
+        return metrics.measure(db, "UNKNOWN", command, parts[1:])
+    return f"UNKNOWN COMMAND: {parts[0]}"
 
 
 def process_command(db: Database, command_str: str) -> str | None:
     """Обрабатывает команду пользователя."""
-    parts = command_str.strip().split()
+    parts = command_str.split()
     if not parts:
         return None
-
-    command_name = parts[0]
-    args = parts[1:] if len(parts) > 1 else []
-
-    command = CommandFactory.create_command(command_name)
-    return command.execute(db, args)
+    entry = _dispatch_table.get(parts[0]) or _lookup(parts[0])
+    if entry is None:
+        return _unknown(db, parts)
+    name, command, words, fast = entry
+    metrics = db.metrics
+    if metrics.enabled:
+        return metrics.measure(db, name, command, parts[1:])
+    if len(parts) == words:
+        return fast(db, parts)
+    return command.execute(db, parts[1:])
+
+
+def process_commands(
+    db: Database, lines: Iterable[str], cache_size: int = 0
+) -> Iterator[str]:
+    """Обрабатывает поток команд, возвращая непустые ответы.
+
+    Обработка прекращается на команде END. При cache_size > 0 разобранные
+    строки (до cache_size различных) запоминаются, и повторяющиеся строки
+    не разбираются заново.
+    """
+    table = _dispatch_table
+    metrics = db.metrics
+    cache: dict[str, tuple[list[str], DispatchEntry | None]] = {}
+    for line in lines:
+        cached = cache.get(line) if cache_size else None
+        if cached is None:
+            parts = line.split()
+            if not parts:
+                continue
+            entry = table.get(parts[0]) or _lookup(parts[0])
+            if cache_size:
+                if len(cache) >= cache_size:
+                    cache.clear()
+                cache[line] = (parts, entry)
+        else:
+            parts, entry = cached
+        if entry is None:
+            yield _unknown(db, parts)
+            continue
+        name, command, words, fast = entry
+        if metrics.enabled:
+            result = metrics.measure(db, name, command, parts[1:])
+        elif len(parts) == words:
+            result = fast(db, parts)
+        else:
+            result = command.execute(db, parts[1:])
+        if result == "EXIT":
+            return
+        if result is not None:
+            yield result
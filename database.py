@@ -1,3 +1,105 @@
+import copy
+import heapq
+import math
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from itertools import islice, takewhile
+
+from eviction import POLICIES
+from metrics import Metrics
+from ordered import SortedKeys
+from snapshot import read_snapshot, write_snapshot
+
+_MISSING = object()
+
+# Зафиксированная операция: (ключ, значение или None для удаления)
+# или (ключ, значение, срок жизни по системным часам time.time()).
+Operation = tuple[str, str | None] | tuple[str, str, float]
+
+# Число курсоров SCAN/FINDSCAN, одновременно хранимых сессией.
+MAX_CURSORS = 64
+
+# Приблизительные накладные расходы на запись: заголовки строк ключа
+# и значения, элементы словаря данных и множества обратного индекса.
+ENTRY_OVERHEAD = 200
+
+
+def entry_size(key: str, value: str) -> int:
+    """Оценивает объём памяти, занимаемый записью, в байтах."""
+    return ENTRY_OVERHEAD + len(key) + len(value)
+
+
+def _index_add(index: dict[str, set[str]], value: str, key: str) -> None:
+    """Добавляет ключ в множество ключей, соответствующих значению."""
+    keys = index.get(value)
+    if keys is None:
+        index[value] = {key}
+    else:
+        keys.add(key)
+
+
+def _index_discard(index: dict[str, set[str]], value: str, key: str) -> None:
+    """Убирает ключ из множества ключей значения, удаляя пустые множества."""
+    keys = index.get(value)
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del index[value]
+
+
+class TransactionConflict(Exception):
+    """Транзакция изменила ключи, зафиксированные после её начала."""
+
+
+class Stats:
+    """Счётчики базы данных, общие для всех её сессий."""
+
+    def __init__(self) -> None:
+        self.used_memory = 0
+        self.evicted_keys = 0
+        self.hits = 0
+        self.misses = 0
+        # Число изменений данных и транзакций: курсор SCAN, открытый до
+        # изменения, становится недействительным.
+        self.changes = 0
+
+
+class StateView(Mapping):
+    """Текущее состояние сессии: зафиксированные данные с наложенными
+    незакоммиченными изменениями, без копирования данных.
+
+    Представление живое: оно отражает последующие SET/UNSET, COMMIT и
+    ROLLBACK сессии. Пока представление перечисляется, база не должна
+    изменяться.
+    """
+
+    def __init__(self, db: "Database") -> None:
+        self._db = db
+
+    def __getitem__(self, key: str) -> str:
+        value = self._db._pending.get(key, _MISSING)
+        if value is _MISSING:
+            return self._db.data[key]
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return self._db.iter_keys()
+
+    def __len__(self) -> int:
+        data = self._db.data
+        size = len(data)
+        for key, value in self._db._pending.items():
+            if key in data:
+                size -= value is None
+            else:
+                size += value is not None
+        return size
+
+
 class Database:
     """
     База данных ключ-значение в оперативной памяти с поддержкой
@@ -7,87 +109,818 @@ class Database:
     значений, подсчёта количества вхождений значений и поиска ключей по
     значению. Также поддерживаются транзакционные операции.
 
+    Для COUNTS и FIND поддерживается обратный индекс (значение -> ключи)
+    зафиксированных данных и поправки к нему от незакоммиченных транзакций,
+    поэтому эти команды не пересобирают состояние всей базы.
+
+    Каждая транзакция хранит словарь изменений (ключ -> значение или None
+    для удалённого ключа), а объединённое представление всех открытых
+    транзакций позволяет получать значение за O(1) независимо от глубины
+    вложенности и числа операций.
+
+    Метод session() создаёт сессию: объект Database с собственным стеком
+    транзакций, разделяющий с базой зафиксированные данные и индекс.
+    Незакоммиченные изменения сессии видны только ей.
+
+    Ключам можно задать срок жизни. Истёкший ключ удаляется при обращении
+    к нему, при COUNTS/FIND (по куче сроков, без просмотра всех данных)
+    и порциями ограниченной длительности в expire_cycle(). Срок жизни,
+    заданный в транзакции, вступает в силу при коммите внешней транзакции.
+
+    Объём зафиксированных данных оценивается приблизительно; при заданном
+    maxmemory после каждой записи ключи вытесняются выбранной политикой
+    (lru, lfu, random, ttl).
+
+    В режиме intern_values одинаковые зафиксированные значения хранятся
+    одним объектом строки (ключом обратного индекса), что сокращает
+    память при большом числе ключей с небольшим набором различных
+    значений.
+
+    В режиме ordered_keys поддерживается упорядоченный индекс ключей,
+    по которому запросы по префиксу и диапазону ключей выполняются без
+    сортировки всех ключей.
+
     Атрибуты:
         data: Основное хранилище данных.
         transaction_stack: Стек транзакций.
+        metrics: Метрики выполнения команд, общие для всех сессий.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        maxmemory: int | None = None,
+        eviction: str = "lru",
+        intern_values: bool = False,
+        ordered_keys: bool = False,
+    ) -> None:
+        if eviction not in POLICIES:
+            raise ValueError(f"Unknown eviction policy: {eviction}")
         self.data: dict[str, str] = {}
-        self.transaction_stack: list[list[dict[str, str | None]]] = []
+        # Обратный индекс зафиксированных данных: значение -> ключи.
+        self._index: dict[str, set[str]] = {}
+        # Упорядоченный индекс зафиксированных ключей.
+        self._ordered = SortedKeys() if ordered_keys else None
+        # Подписчики на зафиксированные изменения (например, журнал).
+        self._listeners: list[Callable[[list[Operation]], None]] = []
+        # Сессии с открытыми транзакциями (общее для всех сессий базы).
+        self._open_sessions: set[Database] = set()
+        self._root = self
+        # Сроки жизни ключей (по clock) и куча (срок, ключ) для их обхода.
+        self._expires: dict[str, float] = {}
+        self._expiry_heap: list[tuple[float, str]] = []
+        self.clock: Callable[[], float] = time.monotonic
+        self.intern_values = intern_values
+        self.maxmemory = maxmemory
+        self.eviction = eviction
+        self._policy = POLICIES[eviction]() if maxmemory is not None else None
+        self._stats = Stats()
+        self.metrics = Metrics()
+        self._wal = None
+        self._snapshot_thread: threading.Thread | None = None
+        self.snapshot_path: str | None = None
+        # Разрешено ли командой SNAPSHOT писать снимок в произвольный файл.
+        self.allow_snapshot_path = True
+        self._cursors: dict[int, tuple[Iterator[str], int]] = {}
+        self._next_cursor = 1
+        self._init_transactions()
+
+    def _init_transactions(self) -> None:
+        self.transaction_stack: list[dict[str, str | None]] = []
+        # Объединённые изменения всех открытых транзакций.
+        self._pending: dict[str, str | None] = {}
+        # Ключи, которым транзакции назначили значение.
+        self._added: dict[str, set[str]] = {}
+        # Зафиксированные ключи, перекрытые транзакциями,
+        # сгруппированные по зафиксированному значению.
+        self._shadowed: dict[str, set[str]] = {}
+        # Сроки жизни, заданные в каждой из открытых транзакций.
+        self._expire_frames: list[dict[str, float]] = []
+
+    def session(self) -> "Database":
+        """Создаёт сессию с собственным стеком транзакций."""
+        session = copy.copy(self)
+        session._cursors = {}
+        session._init_transactions()
+        return session
+
+    def abort_transactions(self) -> None:
+        """Отменяет все открытые транзакции сессии."""
+        self._open_sessions.discard(self)
+        self._init_transactions()
+        self._stats.changes += 1
 
     def begin_transaction(self) -> None:
         """Начинает новую транзакцию."""
-        self.transaction_stack.append([])
+        if not self.transaction_stack:
+            self._open_sessions.add(self)
+        self.transaction_stack.append({})
+        self._expire_frames.append({})
 
     def rollback_transaction(self) -> bool:
-        """Делает роллбэк текущей транзакции."""
+        """Делает роллбэк текущей транзакции.
+
+        Откат внешней транзакции просто сбрасывает все незакоммиченные
+        изменения, вложенной — восстанавливает только затронутые ею ключи.
+        """
         if not self.transaction_stack:
             return False
-        self.transaction_stack.pop()
+        current_transaction = self.transaction_stack.pop()
+        self._expire_frames.pop()
+        if not self.transaction_stack:
+            self._open_sessions.discard(self)
+            self._pending.clear()
+            self._added.clear()
+            self._shadowed.clear()
+            self._stats.changes += 1
+            return True
+        for key, value in current_transaction.items():
+            restored = self._pending_lookup(key)
+            if restored is _MISSING:
+                del self._pending[key]
+            else:
+                self._pending[key] = restored
+            self._track_pending(key, value, restored)
         return True
 
     def commit_transaction(self) -> bool:
-        """Делает коммит текущей транзакции."""
+        """Делает коммит текущей транзакции.
+
+        Изменения вложенной транзакции сливаются с родительской по ключам:
+        меньший словарь переносится в больший. Внешняя транзакция
+        применяется к хранилищу за O(числа изменённых ключей).
+        """
         if not self.transaction_stack:
             return False
         current_transaction = self.transaction_stack.pop()
+        current_expires = self._expire_frames.pop()
         if self.transaction_stack:
+            parent_expires = self._expire_frames[-1]
+            if parent_expires:
+                for key in current_transaction:
+                    parent_expires.pop(key, None)
+            parent_expires.update(current_expires)
             parent_transaction = self.transaction_stack[-1]
-            for operation in current_transaction:
-                parent_transaction.append(operation)
+            if len(current_transaction) < len(parent_transaction):
+                parent_transaction.update(current_transaction)
+            else:
+                for key, value in parent_transaction.items():
+                    current_transaction.setdefault(key, value)
+                self.transaction_stack[-1] = current_transaction
         else:
-            for operation in current_transaction:
-                for key, value in operation.items():
-                    if value is None:
-                        self.data.pop(key, None)
-                    else:
-                        self.data[key] = value
+            self._open_sessions.discard(self)
+            if self._listeners:
+                operations = self._commit_operations(
+                    current_transaction, current_expires
+                )
+                self._publish(operations)
+            for key, value in current_transaction.items():
+                self._store(key, value)
+            for key, deadline in current_expires.items():
+                if key in self.data:
+                    self._set_deadline(key, deadline)
+            self._pending.clear()
+            self._added.clear()
+            self._shadowed.clear()
+            self._stats.changes += 1
+            self._evict_if_needed()
         return True
 
-    def set_value(self, key: str, value: str) -> None:
-        """Добавляет запись в базу или в текущую транзакцию."""
+    def _commit_operations(
+        self,
+        transaction: dict[str, str | None],
+        expires: dict[str, float],
+    ) -> list[Operation]:
+        """Возвращает операции коммита внешней транзакции
+        со сроками жизни, заданными в ней.
+        """
+        operations: list[Operation] = []
+        for key, value in transaction.items():
+            deadline = expires.get(key) if expires else None
+            if deadline is None or value is None:
+                operations.append((key, value))
+            else:
+                operations.append((key, value, self._wall_deadline(deadline)))
+        for key, deadline in expires.items():
+            if key not in transaction and key in self.data:
+                wall = self._wall_deadline(deadline)
+                operations.append((key, self.data[key], wall))
+        return operations
+
+    def set_value(
+        self, key: str, value: str, ttl: float | None = None
+    ) -> None:
+        """Добавляет запись в базу или в текущую транзакцию.
+
+        ttl задаёт срок жизни записи в секундах, без него срок
+        жизни ключа сбрасывается.
+        """
         if self.transaction_stack:
-            self.transaction_stack[-1].append({key: value})
+            previous = self._pending.get(key, _MISSING)
+            self.transaction_stack[-1][key] = value
+            self._pending[key] = value
+            self._track_pending(key, previous, value)
+            expires = self._expire_frames[-1]
+            if ttl is not None:
+                expires[key] = self.clock() + ttl
+            elif expires:
+                expires.pop(key, None)
         else:
-            self.data[key] = value
+            deadline = None if ttl is None else self.clock() + ttl
+            if self._listeners:
+                if deadline is None:
+                    self._publish([(key, value)])
+                else:
+                    wall = self._wall_deadline(deadline)
+                    self._publish([(key, value, wall)])
+            self._store(key, value)
+            if deadline is not None:
+                self._set_deadline(key, deadline)
+            self._evict_if_needed()
 
     def get_value(self, key: str) -> str:
         """Получает значение переменной или NULL при отсутствии."""
-        for transaction in reversed(self.transaction_stack):
-            for operation in reversed(transaction):
-                if key in operation:
-                    value = operation[key]
-                    return "NULL" if value is None else value
-        return self.data.get(key, "NULL")
+        value = self._pending.get(key, _MISSING)
+        if value is _MISSING:
+            if self._expires and key in self._expires:
+                self._expire_if_due(key)
+            value = self.data.get(key)
+            if value is not None and self._policy is not None:
+                self._policy.accessed(key)
+        if value is None:
+            self._stats.misses += 1
+            return "NULL"
+        self._stats.hits += 1
+        return value
 
     def unset_value(self, key: str) -> None:
         """Удаляет запись или добавляет операцию в транзакцию."""
         if self.transaction_stack:
-            self.transaction_stack[-1].append({key: None})
+            previous = self._pending.get(key, _MISSING)
+            self.transaction_stack[-1][key] = None
+            self._pending[key] = None
+            self._track_pending(key, previous, None)
+            if self._expire_frames[-1]:
+                self._expire_frames[-1].pop(key, None)
         else:
-            self.data.pop(key, None)
+            if self._listeners:
+                self._publish([(key, None)])
+            self._store(key, None)
+
+    def info(self) -> dict[str, int | str]:
+        """Возвращает сведения об использовании памяти и обращениях."""
+        stats = self._stats
+        return {
+            "keys": len(self.data),
+            "used_memory": stats.used_memory,
+            "maxmemory": self.maxmemory or 0,
+            "eviction": self.eviction,
+            "evicted_keys": stats.evicted_keys,
+            "expiring_keys": len(self._expires),
+            "keyspace_hits": stats.hits,
+            "keyspace_misses": stats.misses,
+        }
+
+    def set_values(self, items: Iterable[tuple[str, str]]) -> None:
+        """Добавляет несколько записей за один проход.
+
+        Вне транзакции подписчики получают все записи одной пачкой.
+        """
+        self._write_many([(key, value) for key, value in items])
+
+    def get_values(self, keys: Iterable[str]) -> list[str]:
+        """Получает значения нескольких переменных (NULL при отсутствии)."""
+        data = self.data
+        pending = self._pending
+        policy = self._policy
+        expires = self._expires
+        values = []
+        misses = 0
+        for key in keys:
+            value = pending.get(key, _MISSING) if pending else _MISSING
+            if value is _MISSING:
+                if expires and key in expires:
+                    self._expire_if_due(key)
+                value = data.get(key)
+                if value is not None and policy is not None:
+                    policy.accessed(key)
+            if value is None:
+                value = "NULL"
+                misses += 1
+            values.append(value)
+        self._stats.misses += misses
+        self._stats.hits += len(values) - misses
+        return values
+
+    def unset_values(self, keys: Iterable[str]) -> None:
+        """Удаляет несколько записей за один проход."""
+        self._write_many([(key, None) for key in keys])
+
+    def _write_many(self, operations: list[Operation]) -> None:
+        if self.transaction_stack:
+            transaction = self.transaction_stack[-1]
+            pending = self._pending
+            expires = self._expire_frames[-1]
+            for key, value in operations:
+                previous = pending.get(key, _MISSING)
+                transaction[key] = value
+                pending[key] = value
+                self._track_pending(key, previous, value)
+                if expires:
+                    expires.pop(key, None)
+        else:
+            if self._listeners:
+                self._publish(operations)
+            for key, value in operations:
+                self._store(key, value)
+            self._evict_if_needed()
+
+    def expire(self, key: str, seconds: float) -> bool:
+        """Задаёт срок жизни ключа в секундах.
+
+        Неположительный срок удаляет ключ. Возвращает False,
+        если ключа нет.
+        """
+        if not self._exists(key):
+            return False
+        if seconds <= 0:
+            self.unset_value(key)
+        elif self.transaction_stack:
+            self._expire_frames[-1][key] = self.clock() + seconds
+        else:
+            deadline = self.clock() + seconds
+            if self._listeners:
+                wall = self._wall_deadline(deadline)
+                self._publish([(key, self.data[key], wall)])
+            self._set_deadline(key, deadline)
+        return True
+
+    def ttl(self, key: str) -> int:
+        """Возвращает оставшийся срок жизни ключа в секундах.
+
+        -1, если срок жизни не задан, и -2, если ключа нет.
+        """
+        if not self._exists(key):
+            return -2
+        deadline = self._deadline(key)
+        if deadline is None:
+            return -1
+        return max(0, math.ceil(deadline - self.clock()))
+
+    def incr_by(self, key: str, amount: int) -> int:
+        """Увеличивает целое значение ключа на amount и возвращает его.
+
+        Отсутствующий ключ считается равным 0, срок жизни ключа
+        сохраняется. Значение хранится десятичной строкой без лишних
+        знаков, поэтому COUNTS и FIND находят его по обычной записи
+        числа. ValueError, если значение не целое число.
+        """
+        deadline = None
+        number = 0
+        if self._exists(key):
+            value = self.get_value(key)
+            deadline = self._deadline(key)
+            try:
+                number = int(value)
+            except ValueError:
+                number = None
+            if number is None or str(number) != value:
+                raise ValueError(f"Value of {key} is not an integer")
+        number += amount
+        ttl = None if deadline is None else deadline - self.clock()
+        self.set_value(key, str(number), ttl=ttl)
+        return number
 
-    def _current_state(self) -> dict[str, str]:
+    def _deadline(self, key: str) -> float | None:
+        """Возвращает срок жизни существующего ключа с учётом транзакций."""
+        deadline = self._expires.get(key)
+        frames = zip(
+            reversed(self.transaction_stack), reversed(self._expire_frames)
+        )
+        for transaction, expires in frames:
+            if key in expires:
+                return expires[key]
+            if key in transaction:
+                return None
+        return deadline
+
+    def expire_cycle(self, budget: float = 0.001) -> int:
+        """Удаляет истёкшие ключи, тратя не больше budget секунд.
+
+        Возвращает число удалённых ключей.
+        """
+        return self._expire_due(budget)
+
+    def _exists(self, key: str) -> bool:
+        """Проверяет, виден ли ключ с учётом транзакций и сроков жизни."""
+        value = self._pending.get(key, _MISSING)
+        if value is not _MISSING:
+            return value is not None
+        if self._expires and key in self._expires:
+            self._expire_if_due(key)
+        return key in self.data
+
+    def _wall_deadline(self, deadline: float) -> float:
+        """Переводит срок жизни по clock в системное время.
+
+        clock монотонен и не переживает перезапуск, поэтому в журнал,
+        снимки и поток репликации сроки пишутся по time.time().
+        """
+        return time.time() + (deadline - self.clock())
+
+    def _clock_deadline(self, wall: float) -> float:
+        """Переводит срок жизни по системному времени в clock."""
+        return self.clock() + (wall - time.time())
+
+    def _set_deadline(self, key: str, deadline: float) -> None:
+        self._expires[key] = deadline
+        heap = self._expiry_heap
+        heapq.heappush(heap, (deadline, key))
+        if len(heap) > 64 and len(heap) > 2 * len(self._expires):
+            heap[:] = [(d, k) for k, d in self._expires.items()]
+            heapq.heapify(heap)
+
+    def _expire_if_due(self, key: str) -> None:
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= self.clock():
+            self._drop_key(key)
+
+    def _expire_due(self, budget: float | None = None) -> int:
+        """Удаляет ключи, срок жизни которых истёк, по куче сроков."""
+        heap = self._expiry_heap
+        if not heap:
+            return 0
+        now = self.clock()
+        stop = None if budget is None else now + budget
+        expired = 0
+        while heap and heap[0][0] <= now:
+            deadline, key = heapq.heappop(heap)
+            if self._expires.get(key) == deadline:
+                self._drop_key(key)
+                expired += 1
+                if stop is not None and self.clock() >= stop:
+                    break
+        return expired
+
+    def _drop_key(self, key: str) -> None:
+        """Удаляет истёкший или вытесненный ключ,
+        сообщая об этом подписчикам как UNSET.
+        """
+        if self._listeners:
+            self._publish([(key, None)])
+        self._store(key, None)
+
+    def _evict_if_needed(self) -> None:
+        """Вытесняет ключи, пока объём данных превышает maxmemory."""
+        if self.maxmemory is None:
+            return
+        stats = self._stats
+        while stats.used_memory > self.maxmemory:
+            key = self._policy.victim(self)
+            if key is None:
+                return
+            self._drop_key(key)
+            stats.evicted_keys += 1
+
+    def subscribe(self, listener: Callable[[list[Operation]], None]) -> None:
+        """Подписывает обработчик на изменения, попадающие в хранилище.
+
+        Обработчик получает пачку операций (ключ, значение или None)
+        до их применения: одну операцию вне транзакции или все изменения
+        внешней транзакции при её коммите.
+        """
+        self._listeners.append(listener)
+
+    def apply_operations(self, operations: Iterable[Operation]) -> None:
+        """Применяет зафиксированные операции к хранилищу
+        без уведомления подписчиков (восстановление из журнала).
+        """
+        for operation in operations:
+            key = operation[0]
+            self._store(key, operation[1])
+            if len(operation) == 3:
+                self._set_deadline(key, self._clock_deadline(operation[2]))
+        self._evict_if_needed()
+
+    def attach_log(self, wal) -> None:
+        """Восстанавливает данные из журнала и начинает писать в него
+        зафиксированные изменения.
+        """
+        for operations in wal.replay():
+            self.apply_operations(operations)
+        self._wal = wal
+        self.subscribe(wal.append)
+
+    def load_snapshot(self, path: str) -> None:
+        """Загружает зафиксированные данные из снимка.
+
+        Вызывается до начала работы с базой и создания сессий.
+        """
+        self.data, self._index, deadlines = read_snapshot(path)
+        self.snapshot_path = path
+        for key, wall in deadlines.items():
+            self._set_deadline(key, self._clock_deadline(wall))
+        if self._ordered is not None:
+            self._ordered = SortedKeys(self.data)
+        self._stats.used_memory = sum(
+            entry_size(key, value) for key, value in self.data.items()
+        )
+        if self._policy is not None:
+            for key in self.data:
+                self._policy.added(key)
+            self._evict_if_needed()
+
+    def save_snapshot(
+        self, path: str | None = None, background: bool = False
+    ) -> bool:
+        """Сохраняет снимок зафиксированных данных.
+
+        Снимок пишется из копии данных, поэтому в фоновом режиме
+        работа с базой не блокируется на время записи. Журнал начинает
+        новый сегмент, только если снимок пишется в snapshot_path, из
+        которого база восстанавливается при запуске; снимок в другой
+        файл журнал не затрагивает. Возвращает False, если путь не задан
+        или предыдущий снимок ещё пишется.
+        """
+        path = path or self.snapshot_path
+        if path is None or self.snapshot_in_progress():
+            return False
+        root = self._root
+        wal = None
+        if self.snapshot_path is not None and (
+            os.path.abspath(path) == os.path.abspath(self.snapshot_path)
+        ):
+            wal = self._wal
+        data, deadlines = self._checkpoint_data(wal is not None)
+
+        def write() -> None:
+            write_snapshot(path, data, deadlines)
+            if wal is not None:
+                wal.end_checkpoint()
+
+        if background:
+            root._snapshot_thread = threading.Thread(target=write)
+            root._snapshot_thread.start()
+        else:
+            write()
+        return True
+
+    def committed_state(self) -> tuple[dict[str, str], dict[str, float]]:
+        """Копирует зафиксированные данные и сроки жизни ключей
+        по системному времени (time.time()).
+        """
+        deadlines = {
+            key: self._wall_deadline(deadline)
+            for key, deadline in self._expires.items()
+        }
+        return self.data.copy(), deadlines
+
+    def _checkpoint_data(
+        self, rotate_log: bool
+    ) -> tuple[dict[str, str], dict[str, float]]:
+        """Копирует зафиксированное состояние; с rotate_log начинает новый
+        сегмент журнала, чтобы в нём были только изменения после копии.
+        """
+        state = self.committed_state()
+        if rotate_log:
+            self._wal.begin_checkpoint()
+        return state
+
+    def snapshot_in_progress(self) -> bool:
+        """Проверяет, пишется ли снимок в фоновом режиме."""
+        thread = self._root._snapshot_thread
+        return thread is not None and thread.is_alive()
+
+    def wait_snapshot(self) -> None:
+        """Дожидается завершения фоновой записи снимка."""
+        thread = self._root._snapshot_thread
+        if thread is not None:
+            thread.join()
+
+    def _publish(self, operations: list[Operation]) -> None:
+        for listener in self._listeners:
+            listener(operations)
+
+    def _store(self, key: str, value: str | None) -> None:
+        """Записывает значение в основное хранилище, обновляя индекс.
+
+        None означает удаление ключа. Запись сбрасывает срок жизни ключа.
+        Сессии, перекрывающие ключ своими транзакциями, обновляют
+        поправки к индексу.
+        """
+        if self._expires:
+            self._expires.pop(key, None)
+        if self.intern_values and value is not None:
+            keys = self._index.get(value)
+            if keys:
+                # Все ключи значения хранят один объект строки — тот же,
+                # что служит ключом индекса. Запись индекса удаляется
+                # вместе с последним ключом, поэтому объект освобождается.
+                value = self.data[next(iter(keys))]
+        old = self.data.get(key)
+        if old == value:
+            return
+        self._stats.changes += 1
+        policy = self._policy
+        if old is not None:
+            _index_discard(self._index, old, key)
+        if value is None:
+            del self.data[key]
+            self._stats.used_memory -= entry_size(key, old)
+            if policy is not None:
+                policy.removed(key)
+            if self._ordered is not None:
+                self._ordered.discard(key)
+        else:
+            self.data[key] = value
+            _index_add(self._index, value, key)
+            if old is None:
+                self._stats.used_memory += entry_size(key, value)
+                if self._ordered is not None:
+                    self._ordered.add(key)
+                if policy is not None:
+                    policy.added(key)
+            else:
+                self._stats.used_memory += len(value) - len(old)
+                if policy is not None:
+                    policy.accessed(key)
+        if self._open_sessions:
+            for session in self._open_sessions:
+                if key in session._pending:
+                    session._reshadow(key, old, value)
+
+    def _reshadow(self, key: str, old: str | None, new: str | None) -> None:
+        """Переносит перекрытый ключ к новому зафиксированному значению."""
+        if old is not None:
+            _index_discard(self._shadowed, old, key)
+        if new is not None:
+            _index_add(self._shadowed, new, key)
+
+    def _pending_lookup(self, key: str) -> object:
+        """Ищет значение ключа в стеке транзакций, начиная с верхней.
+
+        None означает удаление в транзакции,
+        _MISSING — что транзакции ключ не затрагивали.
+        """
+        for transaction in reversed(self.transaction_stack):
+            if key in transaction:
+                return transaction[key]
+        return _MISSING
+
+    def _track_pending(self, key: str, old: object, new: object) -> None:
+        """Обновляет поправки к индексу при смене
+        незакоммиченного значения ключа с old на new.
+        """
+        self._stats.changes += 1
+        if old is _MISSING:
+            if new is _MISSING:
+                return
+            committed = self.data.get(key)
+            if committed is not None:
+                _index_add(self._shadowed, committed, key)
+        elif old is not None:
+            _index_discard(self._added, old, key)
+        if new is _MISSING:
+            committed = self.data.get(key)
+            if committed is not None:
+                _index_discard(self._shadowed, committed, key)
+        elif new is not None:
+            _index_add(self._added, new, key)
+
+    def _current_state(self) -> StateView:
         """Возвращает текущее состояние БД
         с учётом всех незакоммиченных транзакций.
+
+        Состояние не копируется: представление строится за O(1),
+        а его размер вычисляется за время, пропорциональное числу
+        незакоммиченных изменений.
         """
-        temp_data = self.data.copy()
-        for transaction in self.transaction_stack:
-            for operation in transaction:
-                for key, val in operation.items():
-                    if val is None:
-                        temp_data.pop(key, None)
-                    else:
-                        temp_data[key] = val
-        return temp_data
+        self._expire_due()
+        return StateView(self)
 
     def count_value(self, value: str) -> int:
         """Выводит количество, сколько раз значение встречается в базе."""
-        return list(self._current_state().values()).count(value)
+        self._expire_due()
+        return (
+            len(self._index.get(value, ()))
+            - len(self._shadowed.get(value, ()))
+            + len(self._added.get(value, ()))
+        )
+
+    def iter_keys(self, value: str | None = None) -> Iterator[str]:
+        """Перечисляет ключи с заданным значением (или все ключи),
+        не копируя данные и индекс.
+
+        Пока перечисление не завершено, база не должна изменяться.
+        """
+        self._expire_due()
+        pending = self._pending
+        if value is None:
+            committed = self.data
+            added = (key for key, val in pending.items() if val is not None)
+        else:
+            committed = self._index.get(value, ())
+            added = self._added.get(value, ())
+        if pending:
+            for key in committed:
+                if key not in pending:
+                    yield key
+            yield from added
+        else:
+            yield from committed
+
+    def scan(
+        self, cursor: int = 0, count: int = 10, value: str | None = None
+    ) -> tuple[int, list[str]]:
+        """Возвращает порцию из count ключей и курсор следующей порции.
+
+        Курсор 0 начинает перечисление ключей с заданным значением
+        (или всех ключей); возвращённый курсор 0 означает, что ключи
+        закончились. Курсор продолжает перечисление живых данных без
+        копирования, поэтому каждая порция стоит O(count). Любое
+        изменение данных или транзакций базы делает открытые курсоры
+        недействительными: перечисление нужно начать заново. Неизвестный
+        или недействительный курсор вызывает KeyError.
+        """
+        if cursor == 0:
+            iterator = self.iter_keys(value)
+        else:
+            iterator, changes = self._cursors.pop(cursor)
+            if changes != self._stats.changes:
+                raise KeyError(cursor)
+        try:
+            page = list(islice(iterator, count))
+        except RuntimeError:
+            # Данные изменились в другом потоке во время перечисления.
+            raise KeyError(cursor) from None
+        if len(page) < count:
+            return 0, page
+        cursor = self._next_cursor
+        self._next_cursor += 1
+        self._cursors[cursor] = (iterator, self._stats.changes)
+        if len(self._cursors) > MAX_CURSORS:
+            del self._cursors[next(iter(self._cursors))]
+        return cursor, page
+
+    def iter_range(
+        self, start: str = "", end: str | None = None
+    ) -> Iterator[str]:
+        """Перечисляет по возрастанию ключи от start до end включительно
+        (без end — до конца) с учётом незакоммиченных транзакций.
+
+        С упорядоченным индексом перечисление стоит O(log n) плюс число
+        перечисленных ключей и незакоммиченных изменений, без него
+        сортируются все ключи. Пока перечисление не завершено, база
+        не должна изменяться.
+        """
+        self._expire_due()
+        if self._ordered is not None:
+            committed = self._ordered.irange(start, end)
+        else:
+            committed = (
+                key for key in sorted(self.data)
+                if start <= key and (end is None or key <= end)
+            )
+        pending = self._pending
+        if not pending:
+            yield from committed
+            return
+        added = sorted(
+            key for key, value in pending.items()
+            if value is not None
+            and start <= key
+            and (end is None or key <= end)
+        )
+        committed = (key for key in committed if key not in pending)
+        yield from heapq.merge(committed, added)
+
+    def range_keys(
+        self, start: str, end: str | None = None, limit: int | None = None
+    ) -> list[str]:
+        """Возвращает до limit ключей от start до end включительно."""
+        return list(islice(self.iter_range(start, end), limit))
+
+    def iter_prefix(self, prefix: str) -> Iterator[str]:
+        """Перечисляет по возрастанию ключи с префиксом."""
+        return takewhile(
+            lambda key: key.startswith(prefix), self.iter_range(prefix)
+        )
+
+    def prefix_keys(self, prefix: str, limit: int | None = None) -> list[str]:
+        """Возвращает по возрастанию до limit ключей с префиксом."""
+        return list(islice(self.iter_prefix(prefix), limit))
+
+    def count_prefix(self, prefix: str) -> int:
+        """Выводит количество ключей с префиксом."""
+        return sum(1 for _ in self.iter_prefix(prefix))
 
     def find_keys(self, value: str) -> set[str]:
         """Выводит все переменные с заданным значением."""
-        return {
-            key for key, val in self._current_state().items() if val == value
-        }
+        self._expire_due()
+        keys = set(self._index.get(value, ()))
+        shadowed = self._shadowed.get(value)
+        if shadowed:
+            keys -= shadowed
+        added = self._added.get(value)
+        if added:
+            keys |= added
+        return keys
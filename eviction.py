@@ -0,0 +1,159 @@
+import heapq
+import random
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+class KeySampler:
+    """Множество ключей с выбором случайного ключа за O(1)."""
+
+    def __init__(self) -> None:
+        self._keys: list[str] = []
+        self._positions: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: str) -> None:
+        if key not in self._positions:
+            self._positions[key] = len(self._keys)
+            self._keys.append(key)
+
+    def remove(self, key: str) -> None:
+        position = self._positions.pop(key, None)
+        if position is None:
+            return
+        last = self._keys.pop()
+        if position < len(self._keys):
+            self._keys[position] = last
+            self._positions[last] = position
+
+    def choice(self) -> str | None:
+        if not self._keys:
+            return None
+        return self._keys[random.randrange(len(self._keys))]
+
+
+class EvictionPolicy(ABC):
+    """Абстрактный базовый класс для политик вытеснения ключей."""
+
+    @abstractmethod
+    def added(self, key: str) -> None:
+        """Учитывает новый ключ."""
+        pass
+
+    @abstractmethod
+    def accessed(self, key: str) -> None:
+        """Учитывает чтение или перезапись ключа."""
+        pass
+
+    @abstractmethod
+    def removed(self, key: str) -> None:
+        """Забывает удалённый ключ."""
+        pass
+
+    @abstractmethod
+    def victim(self, db) -> str | None:
+        """Выбирает ключ для вытеснения."""
+        pass
+
+
+class LRUPolicy(EvictionPolicy):
+    """Вытесняет ключ, к которому дольше всего не обращались."""
+
+    def __init__(self) -> None:
+        self._order: OrderedDict[str, None] = OrderedDict()
+
+    def added(self, key: str) -> None:
+        self._order[key] = None
+
+    def accessed(self, key: str) -> None:
+        self._order.move_to_end(key)
+
+    def removed(self, key: str) -> None:
+        self._order.pop(key, None)
+
+    def victim(self, db) -> str | None:
+        return next(iter(self._order), None)
+
+
+class LFUPolicy(EvictionPolicy):
+    """Приближённо вытесняет самый редко используемый ключ.
+
+    Для каждого ключа хранится логарифмический счётчик обращений,
+    который растёт с убывающей вероятностью. Жертва выбирается
+    среди samples случайных ключей.
+    """
+
+    INITIAL = 5
+    LIMIT = 255
+
+    def __init__(self, samples: int = 5, log_factor: int = 10) -> None:
+        self.samples = samples
+        self.log_factor = log_factor
+        self._counters: dict[str, int] = {}
+        self._sampler = KeySampler()
+
+    def added(self, key: str) -> None:
+        self._counters[key] = self.INITIAL
+        self._sampler.add(key)
+
+    def accessed(self, key: str) -> None:
+        counter = self._counters[key]
+        if counter >= self.LIMIT:
+            return
+        base = max(0, counter - self.INITIAL)
+        if random.random() * (base * self.log_factor + 1) < 1:
+            self._counters[key] = counter + 1
+
+    def removed(self, key: str) -> None:
+        if self._counters.pop(key, None) is not None:
+            self._sampler.remove(key)
+
+    def victim(self, db) -> str | None:
+        candidates = {self._sampler.choice() for _ in range(self.samples)}
+        candidates.discard(None)
+        return min(candidates, key=self._counters.__getitem__, default=None)
+
+
+class RandomPolicy(EvictionPolicy):
+    """Вытесняет случайный ключ."""
+
+    def __init__(self) -> None:
+        self._sampler = KeySampler()
+
+    def added(self, key: str) -> None:
+        self._sampler.add(key)
+
+    def accessed(self, key: str) -> None:
+        pass
+
+    def removed(self, key: str) -> None:
+        self._sampler.remove(key)
+
+    def victim(self, db) -> str | None:
+        return self._sampler.choice()
+
+
+class TTLPolicy(RandomPolicy):
+    """Вытесняет ключ с ближайшим сроком жизни.
+
+    Если ключей со сроком жизни нет, вытесняет случайный ключ.
+    """
+
+    def victim(self, db) -> str | None:
+        heap = db._expiry_heap
+        while heap:
+            deadline, key = heap[0]
+            if db._expires.get(key) == deadline:
+                return key
+            heapq.heappop(heap)
+        return super().victim(db)
+
+
+POLICIES: dict[str, type[EvictionPolicy]] = {
+    "lru": LRUPolicy,
+    "lfu": LFUPolicy,
+    "random": RandomPolicy,
+    "ttl": TTLPolicy,
+}
@@ -1,21 +1,145 @@
-from commands import process_command
+import argparse
+import os
+import sys
+from itertools import islice
+
+from commands import process_command, process_commands
 from database import Database
+from eviction import POLICIES
+from metrics import SLOWLOG_THRESHOLD_US
+from wal import FSYNC_ALWAYS, FSYNC_MODES, WriteAheadLog
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Создаёт разборщик аргументов командной строки."""
+    parser = argparse.ArgumentParser(description="In-memory key-value DB")
+    parser.add_argument(
+        "--batch",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="выполнить команды из файла (или stdin) без приглашения",
+    )
+    parser.add_argument(
+        "--snapshot",
+        metavar="PATH",
+        help="файл снимка: загружается при запуске, пишется командой SNAPSHOT",
+    )
+    parser.add_argument(
+        "--maxmemory",
+        type=int,
+        metavar="BYTES",
+        help="предельный объём данных, после которого ключи вытесняются",
+    )
+    parser.add_argument(
+        "--eviction",
+        choices=POLICIES,
+        default="lru",
+        help="политика вытеснения ключей",
+    )
+    parser.add_argument(
+        "--intern-values",
+        action="store_true",
+        help="хранить одинаковые значения одним объектом",
+    )
+    parser.add_argument(
+        "--ordered-keys",
+        action="store_true",
+        help="поддерживать упорядоченный индекс для KEYS, RANGE, COUNTPREFIX",
+    )
+    parser.add_argument(
+        "--wal", metavar="PATH", help="журнал для восстановления после сбоя"
+    )
+    parser.add_argument(
+        "--fsync",
+        choices=FSYNC_MODES,
+        default=FSYNC_ALWAYS,
+        help="режим синхронизации журнала с диском",
+    )
+    parser.add_argument(
+        "--fsync-interval",
+        type=int,
+        default=1000,
+        metavar="MS",
+        help="период fsync в режиме interval, мс",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="собирать метрики команд (STATS, SLOWLOG)",
+    )
+    parser.add_argument(
+        "--slowlog-threshold",
+        type=int,
+        default=SLOWLOG_THRESHOLD_US,
+        metavar="US",
+        help="длительность команды для журнала медленных команд, мкс",
+    )
+    return parser
+
+
+def open_database(args: argparse.Namespace) -> tuple[Database, list]:
+    """Создаёт базу данных, восстанавливая её из снимка и журнала.
+
+    Возвращает базу и список ресурсов, которые нужно закрыть.
+    """
+    db = Database(
+        maxmemory=args.maxmemory,
+        eviction=args.eviction,
+        intern_values=args.intern_values,
+        ordered_keys=args.ordered_keys,
+    )
+    db.metrics.enabled = args.metrics
+    db.metrics.slowlog_threshold_us = args.slowlog_threshold
+    resources = []
+    if args.snapshot:
+        if os.path.exists(args.snapshot):
+            db.load_snapshot(args.snapshot)
+        db.snapshot_path = args.snapshot
+    if args.wal:
+        wal = WriteAheadLog(args.wal, args.fsync, args.fsync_interval)
+        db.attach_log(wal)
+        resources.append(wal)
+    return db, resources
+
+
+def run_batch(db: Database, path: str, chunk_size: int = 4096) -> None:
+    """Выполняет команды из файла или stdin, выводя ответы пачками."""
+    source = sys.stdin if path == "-" else open(path)
+    try:
+        replies = process_commands(db, source)
+        while chunk := list(islice(replies, chunk_size)):
+            sys.stdout.write("\n".join(chunk))
+            sys.stdout.write("\n")
+    finally:
+        sys.stdout.flush()
+        if source is not sys.stdin:
+            source.close()
 
 
-def main():
+def main(argv: list[str] | None = None):
     """Запускает цикл ожидания команд пользователя."""
-    db = Database()
-    while True:
-        try:
-            print("> ", end="", flush=True)
-            line = input()
-            result = process_command(db, line)
-            if result == "EXIT":
+    args = build_parser().parse_args(argv)
+    db, resources = open_database(args)
+    try:
+        if args.batch:
+            run_batch(db, args.batch)
+            return
+        while True:
+            try:
+                print("> ", end="", flush=True)
+                line = input()
+                result = process_command(db, line)
+                if result == "EXIT":
+                    break
+                if result is not None:
+                    print(result)
+            except (EOFError, KeyboardInterrupt):
                 break
-            if result is not None:
-                print(result)
-        except (EOFError, KeyboardInterrupt):
-            break
+    finally:
+        db.wait_snapshot()
+        for resource in resources:
+            resource.close()
 
 
 if __name__ == "__main__":
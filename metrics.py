@@ -0,0 +1,159 @@
+import time
+from collections import deque
+from collections.abc import Callable
+
+# Число значащих бит в границах корзин гистограммы: погрешность
+# перцентилей не превышает 1 / 2**(SIGNIFICANT_BITS - 1).
+SIGNIFICANT_BITS = 5
+SLOWLOG_THRESHOLD_US = 10_000
+SLOWLOG_MAX_LEN = 128
+
+Hook = Callable[[str, list[str], int], None]
+
+
+class LatencyHistogram:
+    """Гистограмма задержек в наносекундах с логарифмическими корзинами.
+
+    Как в HDR-гистограмме, ширина корзины растёт вместе со значением,
+    поэтому память не зависит от числа измерений, а относительная
+    погрешность перцентилей ограничена.
+    """
+
+    def __init__(self) -> None:
+        self.counts: dict[int, int] = {}
+
+    def record(self, value: int) -> None:
+        shift = value.bit_length() - SIGNIFICANT_BITS
+        if shift > 0:
+            value = value >> shift << shift
+        counts = self.counts
+        counts[value] = counts.get(value, 0) + 1
+
+    def percentile(self, fraction: float) -> int:
+        """Возвращает верхнюю границу корзины с заданным перцентилем."""
+        total = sum(self.counts.values())
+        if not total:
+            return 0
+        rank = max(1, round(total * fraction))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                shift = max(bucket.bit_length() - SIGNIFICANT_BITS, 0)
+                return bucket + (1 << shift) - 1
+        return bucket
+
+
+class CommandStats:
+    """Число вызовов, суммарное время и задержки одной команды."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_ns = 0
+        self.histogram = LatencyHistogram()
+
+    def summary(self) -> dict[str, int | float]:
+        histogram = self.histogram
+        return {
+            "calls": self.calls,
+            "usec": self.total_ns // 1000,
+            "usec_per_call": round(self.total_ns / self.calls / 1000, 2),
+            "p50": histogram.percentile(0.5) // 1000,
+            "p99": histogram.percentile(0.99) // 1000,
+            "p999": histogram.percentile(0.999) // 1000,
+        }
+
+
+class SlowEntry:
+    """Запись журнала медленных команд."""
+
+    def __init__(
+        self, entry_id: int, elapsed_ns: int, name: str, args: list[str]
+    ) -> None:
+        self.id = entry_id
+        self.timestamp = time.time()
+        self.elapsed_ns = elapsed_ns
+        self.name = name
+        self.args = args
+
+    def __str__(self) -> str:
+        command = " ".join([self.name, *self.args])
+        return f"{self.id}:{self.elapsed_ns // 1000}:{command}"
+
+
+class Metrics:
+    """Метрики выполнения команд, общие для всех сессий базы.
+
+    Пока enabled ложно, команды выполняются без замеров. Для каждой
+    команды учитываются вызовы, суммарное время и гистограмма задержек,
+    а также наибольшие глубина транзакций и размер верхнего уровня
+    транзакции. Команды дольше slowlog_threshold_us попадают в журнал
+    медленных команд. Хуки вызываются после каждой команды с её именем,
+    аргументами и длительностью в наносекундах.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        slowlog_threshold_us: int = SLOWLOG_THRESHOLD_US,
+        slowlog_max_len: int = SLOWLOG_MAX_LEN,
+    ) -> None:
+        self.enabled = enabled
+        self.slowlog_threshold_us = slowlog_threshold_us
+        self.hooks: list[Hook] = []
+        self.slowlog: deque[SlowEntry] = deque(maxlen=slowlog_max_len)
+        self.reset()
+
+    def reset(self) -> None:
+        """Обнуляет счётчики и журнал медленных команд."""
+        self.commands: dict[str, CommandStats] = {}
+        self.max_depth = 0
+        self.max_frame_size = 0
+        self.slowlog.clear()
+        self._next_slow_id = 0
+
+    def add_hook(self, hook: Hook) -> None:
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: Hook) -> None:
+        self.hooks.remove(hook)
+
+    def measure(self, db, name: str, command, args: list[str]) -> str | None:
+        """Выполняет команду, учитывая её длительность."""
+        started = time.perf_counter_ns()
+        result = command.execute(db, args)
+        self.record(db, name, args, time.perf_counter_ns() - started)
+        return result
+
+    def record(self, db, name: str, args: list[str], elapsed: int) -> None:
+        """Учитывает выполненную команду и состояние транзакций db."""
+        stats = self.commands.get(name)
+        if stats is None:
+            stats = self.commands[name] = CommandStats()
+        stats.calls += 1
+        stats.total_ns += elapsed
+        stats.histogram.record(elapsed)
+
+        stack = db.transaction_stack
+        if stack:
+            if len(stack) > self.max_depth:
+                self.max_depth = len(stack)
+            # У шардированной базы уровни транзакций хранятся в шардах.
+            frame = stack[-1]
+            if frame is not None and len(frame) > self.max_frame_size:
+                self.max_frame_size = len(frame)
+
+        if elapsed >= self.slowlog_threshold_us * 1000:
+            self._next_slow_id += 1
+            self.slowlog.appendleft(
+                SlowEntry(self._next_slow_id, elapsed, name, args)
+            )
+        for hook in self.hooks:
+            hook(name, args, elapsed)
+
+    def summary(self) -> dict[str, dict[str, int | float]]:
+        """Возвращает сводку по каждой выполненной команде."""
+        return {
+            name: stats.summary()
+            for name, stats in sorted(self.commands.items())
+        }
@@ -0,0 +1,84 @@
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+
+BLOCK_SIZE = 1000
+
+
+class SortedKeys:
+    """Упорядоченное множество ключей.
+
+    Ключи хранятся отсортированными блоками размером до 2 * BLOCK_SIZE
+    вместе со списком наибольших ключей блоков, поэтому вставка
+    и удаление стоят O(log n + BLOCK_SIZE), а перечисление диапазона —
+    O(log n + число ключей в нём).
+    """
+
+    def __init__(self, keys: Iterable[str] = ()) -> None:
+        ordered = sorted(set(keys))
+        self._blocks: list[list[str]] = [
+            ordered[i:i + BLOCK_SIZE]
+            for i in range(0, len(ordered), BLOCK_SIZE)
+        ]
+        self._maxes: list[str] = [block[-1] for block in self._blocks]
+        self._len = len(ordered)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, key: str) -> None:
+        blocks = self._blocks
+        if not blocks:
+            blocks.append([key])
+            self._maxes.append(key)
+            self._len += 1
+            return
+        i = bisect_left(self._maxes, key)
+        if i == len(blocks):
+            i -= 1
+            blocks[i].append(key)
+            self._maxes[i] = key
+        else:
+            block = blocks[i]
+            j = bisect_left(block, key)
+            if j < len(block) and block[j] == key:
+                return
+            block.insert(j, key)
+        self._len += 1
+        if len(blocks[i]) > 2 * BLOCK_SIZE:
+            block = blocks[i]
+            blocks[i:i + 1] = [block[:BLOCK_SIZE], block[BLOCK_SIZE:]]
+            self._maxes[i:i + 1] = [block[BLOCK_SIZE - 1], block[-1]]
+
+    def discard(self, key: str) -> None:
+        i = bisect_left(self._maxes, key)
+        if i == len(self._blocks):
+            return
+        block = self._blocks[i]
+        j = bisect_left(block, key)
+        if j == len(block) or block[j] != key:
+            return
+        del block[j]
+        self._len -= 1
+        if block:
+            self._maxes[i] = block[-1]
+        else:
+            del self._blocks[i]
+            del self._maxes[i]
+
+    def irange(
+        self, start: str = "", end: str | None = None
+    ) -> Iterator[str]:
+        """Перечисляет по возрастанию ключи от start до end включительно
+        (без end — до конца).
+        """
+        i = bisect_left(self._maxes, start)
+        if i == len(self._blocks):
+            return
+        blocks = self._blocks
+        j = bisect_left(blocks[i], start)
+        for block in (blocks[k] for k in range(i, len(blocks))):
+            if end is not None and block[-1] > end:
+                yield from block[j:bisect_right(block, end)]
+                return
+            yield from block[j:]
+            j = 0
@@ -0,0 +1,257 @@
+import asyncio
+import os
+import secrets
+import tempfile
+from collections import deque
+from itertools import islice
+
+from database import Database, Operation
+from snapshot import read_snapshot, write_snapshot
+from wal import decode_records, encode_batch
+
+BACKLOG_SIZE = 1 << 20
+# Реплика, не успевающая читать поток, отключается и затем
+# синхронизируется заново.
+MAX_REPLICA_BUFFER = 64 << 20
+CHUNK_SIZE = 1 << 16
+
+
+class Backlog:
+    """Последние переданные записи для продолжения репликации.
+
+    Хранит записи общим объёмом не больше size байт (но хотя бы
+    последнюю). start и end — смещения потока в начале первой
+    хранимой записи и в конце последней.
+    """
+
+    def __init__(self, size: int = BACKLOG_SIZE) -> None:
+        self.size = size
+        self._records: deque[bytes] = deque()
+        self._bytes = 0
+        self.start = 0
+        self.end = 0
+
+    def append(self, record: bytes) -> None:
+        self._records.append(record)
+        self._bytes += len(record)
+        self.end += len(record)
+        while self._bytes > self.size and len(self._records) > 1:
+            dropped = self._records.popleft()
+            self._bytes -= len(dropped)
+            self.start += len(dropped)
+
+    def since(self, offset: int) -> bytes | None:
+        """Возвращает записи после offset или None, если их уже нет
+        или offset не совпадает с границей записи.
+        """
+        if offset == self.end:
+            return b""
+        position = self.start
+        for index, record in enumerate(self._records):
+            if position == offset:
+                return b"".join(islice(self._records, index, None))
+            if position > offset:
+                break
+            position += len(record)
+        return None
+
+
+def _encode_data(
+    data: dict[str, str], deadlines: dict[str, float]
+) -> bytes:
+    """Кодирует данные и сроки жизни ключей в формате снимка."""
+    fd, path = tempfile.mkstemp(suffix=".snapshot")
+    os.close(fd)
+    try:
+        write_snapshot(path, data, deadlines)
+        with open(path, "rb") as snapshot_file:
+            return snapshot_file.read()
+    finally:
+        os.remove(path)
+
+
+def _decode_data(
+    payload: bytes,
+) -> tuple[dict[str, str], dict[str, float]]:
+    """Декодирует данные и сроки жизни, закодированные _encode_data."""
+    fd, path = tempfile.mkstemp(suffix=".snapshot")
+    try:
+        with os.fdopen(fd, "wb") as snapshot_file:
+            snapshot_file.write(payload)
+        data, _, deadlines = read_snapshot(path)
+        return data, deadlines
+    finally:
+        os.remove(path)
+
+
+class _ReplicaConnection:
+    """Подключение реплики к ведущей базе."""
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.writer = writer
+        # Записи, накопленные за время полной синхронизации.
+        self.pending: list[bytes] | None = []
+
+
+class Primary:
+    """
+    Ведущая база: передаёт репликам зафиксированные операции.
+
+    Операции, попадающие в хранилище (SET/UNSET вне транзакций, коммит
+    внешней транзакции, удаление истёкших и вытесненных ключей),
+    кодируются записями журнала и рассылаются подключённым репликам.
+    Смещение потока — число переданных байт записей. Реплика
+    подключается командой SYNC с идентификатором потока и своим
+    смещением: если записи после него есть в backlog, передаются только
+    они (CONTINUE), иначе сначала передаётся снимок данных (FULLSYNC).
+
+    Используется из потока цикла событий, в котором изменяется база.
+
+    Атрибуты:
+        replid: Идентификатор потока, новый при каждом запуске.
+        offset: Смещение конца потока.
+    """
+
+    def __init__(self, db: Database, backlog_size: int = BACKLOG_SIZE):
+        self.db = db
+        self.replid = secrets.token_hex(20)
+        self.offset = 0
+        self.backlog = Backlog(backlog_size)
+        self._replicas: set[_ReplicaConnection] = set()
+        db.subscribe(self._feed)
+
+    def _feed(self, operations: list[Operation]) -> None:
+        record = encode_batch(operations)
+        self.offset += len(record)
+        self.backlog.append(record)
+        for replica in list(self._replicas):
+            if replica.pending is not None:
+                replica.pending.append(record)
+                continue
+            writer = replica.writer
+            if writer.transport.get_write_buffer_size() > MAX_REPLICA_BUFFER:
+                self._replicas.discard(replica)
+                writer.close()
+            else:
+                writer.write(record)
+
+    async def handle_replica(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Обслуживает подключение одной реплики до её отключения."""
+        replica = _ReplicaConnection(writer)
+        try:
+            request = (await reader.readline()).decode().split()
+            if len(request) != 3 or request[0] != "SYNC":
+                return
+            replid, offset = request[1], int(request[2])
+            missing = None
+            if replid == self.replid:
+                missing = self.backlog.since(offset)
+            if missing is not None:
+                writer.write(f"CONTINUE {self.replid} {offset}\n".encode())
+                writer.write(missing)
+                replica.pending = None
+                self._replicas.add(replica)
+            else:
+                offset = self.offset
+                data, deadlines = self.db.committed_state()
+                self._replicas.add(replica)
+                payload = await asyncio.to_thread(
+                    _encode_data, data, deadlines
+                )
+                header = f"FULLSYNC {self.replid} {offset} {len(payload)}\n"
+                writer.write(header.encode())
+                writer.write(payload)
+                writer.writelines(replica.pending)
+                replica.pending = None
+            await writer.drain()
+            while await reader.read(CHUNK_SIZE):
+                pass
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self._replicas.discard(replica)
+            writer.close()
+
+
+class Replica:
+    """
+    Реплика: применяет к базе поток операций ведущей базы.
+
+    При обрыве соединения реплика переподключается и продолжает поток
+    со своего смещения, а если ведущая база его уже не хранит —
+    заново получает снимок данных. Пришедшие одновременно записи
+    применяются одной пачкой.
+
+    Атрибуты:
+        replid: Идентификатор потока ведущей базы.
+        offset: Смещение применённой части потока.
+        synced: Событие, устанавливаемое после первой синхронизации.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        host: str,
+        port: int,
+        retry_interval: float = 1.0,
+    ) -> None:
+        self.db = db
+        self.host = host
+        self.port = port
+        self.retry_interval = retry_interval
+        self.replid = "?"
+        self.offset = -1
+        self.synced = asyncio.Event()
+
+    async def run(self) -> None:
+        """Реплицирует данные, переподключаясь, пока задача не отменена."""
+        while True:
+            try:
+                await self.sync()
+            except (OSError, ValueError, asyncio.IncompleteReadError):
+                pass
+            await asyncio.sleep(self.retry_interval)
+
+    async def sync(self) -> None:
+        """Синхронизируется с ведущей базой и применяет поток
+        до закрытия соединения.
+        """
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(f"SYNC {self.replid} {self.offset}\n".encode())
+            header = (await reader.readline()).decode().split()
+            if header[:1] == ["FULLSYNC"]:
+                payload = await reader.readexactly(int(header[3]))
+                data, deadlines = _decode_data(payload)
+                self._replace_data(data)
+                self.db.apply_operations(
+                    (key, data[key], wall) for key, wall in deadlines.items()
+                )
+                self.replid, self.offset = header[1], int(header[2])
+            elif header[:1] != ["CONTINUE"]:
+                raise ConnectionError("Unexpected reply from primary")
+            self.synced.set()
+            buffer = b""
+            while chunk := await reader.read(CHUNK_SIZE):
+                buffer += chunk
+                operations: list[Operation] = []
+                consumed = 0
+                for end, batch in decode_records(buffer, strict=True):
+                    operations.extend(batch)
+                    consumed = end
+                if consumed:
+                    self.db.apply_operations(operations)
+                    self.offset += consumed
+                    buffer = buffer[consumed:]
+        finally:
+            writer.close()
+
+    def _replace_data(self, data: dict[str, str]) -> None:
+        """Заменяет данные базы снимком, не пересоздавая хранилище,
+        чтобы открытые сессии видели новые данные.
+        """
+        removed = [(key, None) for key in self.db.data if key not in data]
+        self.db.apply_operations(removed)
+        self.db.apply_operations(data.items())
@@ -0,0 +1,112 @@
+import asyncio
+
+from commands import process_command
+from database import Database
+from main import build_parser, open_database
+from replication import Primary, Replica
+
+
+async def handle_client(
+    db: Database, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """Обслуживает одно подключение.
+
+    Каждая строка — команда в том же формате, что и в консоли. На каждую
+    команду отправляется ровно одна строка ответа: результат команды
+    или OK, если команда ничего не выводит. END закрывает подключение.
+    Клиенты не могут указать путь снимка: SNAPSHOT пишет его только
+    в файл, заданный при запуске.
+    """
+    session = db.session()
+    session.allow_snapshot_path = False
+    try:
+        while line := await reader.readline():
+            result = process_command(session, line.decode())
+            if result == "EXIT":
+                break
+            writer.write(f"{'OK' if result is None else result}\n".encode())
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        session.abort_transactions()
+        writer.close()
+
+
+async def expire_periodically(
+    db: Database, interval: float = 0.1, budget: float = 0.001
+) -> None:
+    """Удаляет истёкшие ключи короткими порциями между командами."""
+    while True:
+        await asyncio.sleep(interval)
+        db.expire_cycle(budget)
+
+
+async def serve(
+    db: Database,
+    host: str,
+    port: int,
+    replication_port: int | None = None,
+    primary: tuple[str, int] | None = None,
+) -> None:
+    """Принимает подключения клиентов, пока задача не будет отменена.
+
+    С replication_port база принимает подключения реплик, а с primary
+    работает репликой базы по этому адресу.
+    """
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_client(db, reader, writer), host, port
+    )
+    tasks = [asyncio.create_task(expire_periodically(db))]
+    if replication_port is not None:
+        source = Primary(db)
+        replication = await asyncio.start_server(
+            source.handle_replica, host, replication_port
+        )
+        tasks.append(asyncio.create_task(replication.serve_forever()))
+    if primary is not None:
+        tasks.append(asyncio.create_task(Replica(db, *primary).run()))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Запускает TCP-сервер базы данных."""
+    parser = build_parser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6380)
+    parser.add_argument(
+        "--replication-port",
+        type=int,
+        metavar="PORT",
+        help="принимать подключения реплик на этом порту",
+    )
+    parser.add_argument(
+        "--replica-of",
+        metavar="HOST:PORT",
+        help="работать репликой базы с этим портом репликации",
+    )
+    args = parser.parse_args(argv)
+    primary = None
+    if args.replica_of:
+        host, _, port = args.replica_of.rpartition(":")
+        primary = (host, int(port))
+    db, resources = open_database(args)
+    try:
+        asyncio.run(
+            serve(db, args.host, args.port, args.replication_port, primary)
+        )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db.wait_snapshot()
+        for resource in resources:
+            resource.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import heapq
+import multiprocessing
+import zlib
+from collections.abc import Iterable
+from itertools import islice
+from multiprocessing.connection import Connection
+
+from database import Database
+from metrics import Metrics
+
+
+def _serve_shard(connection: Connection, options: dict) -> None:
+    """Цикл процесса-шарда: выполняет вызовы методов своей базы данных."""
+    db = Database(**options)
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        method, args = request
+        try:
+            connection.send(getattr(db, method)(*args))
+        except Exception as error:
+            connection.send(error)
+    connection.close()
+
+
+class ShardedDatabase:
+    """
+    База данных, ключи которой распределены по хешу между процессами.
+
+    Каждый шард — отдельный процесс со своим экземпляром Database.
+    SET/GET/UNSET направляются шарду, владеющему ключом, пакетные
+    операции группируются по шардам и выполняются параллельно, а COUNTS и
+    FIND рассылаются всем шардам с объединением результатов. BEGIN, COMMIT
+    и ROLLBACK рассылаются всем шардам, поэтому глубина вложенности
+    транзакций у шардов всегда одинакова. Снимок состоит из файлов
+    шардов path.0, path.1, ... и загружается базой с тем же числом
+    шардов. Исключение в шарде выбрасывается в вызывающем процессе.
+
+    Атрибуты:
+        shards: Число шардов.
+        transaction_stack: Стек транзакций (по одному элементу на уровень).
+        metrics: Метрики команд, выполненных через этот объект.
+        snapshot_path: Путь снимка по умолчанию.
+        allow_snapshot_path: Разрешено ли команде SNAPSHOT указывать путь.
+    """
+
+    def __init__(self, shards: int = 4, **options) -> None:
+        self.shards = shards
+        self.transaction_stack: list[None] = []
+        self.metrics = Metrics()
+        self.snapshot_path: str | None = None
+        self.allow_snapshot_path = True
+        self._connections: list[Connection] = []
+        self._processes: list[multiprocessing.Process] = []
+        for _ in range(shards):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_serve_shard, args=(child, options), daemon=True
+            )
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    def __enter__(self) -> "ShardedDatabase":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Останавливает процессы шардов."""
+        for connection in self._connections:
+            connection.send(None)
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections = []
+        self._processes = []
+
+    def shard_for(self, key: str) -> int:
+        """Возвращает номер шарда, которому принадлежит ключ."""
+        return zlib.crc32(key.encode()) % self.shards
+
+    def _call(self, shard: int, method: str, *args):
+        connection = self._connections[shard]
+        connection.send((method, args))
+        return self._receive([shard])[0]
+
+    def _receive(self, shards: Iterable[int]) -> list:
+        """Принимает ответы шардов и выбрасывает первое исключение.
+
+        Ответы читаются у всех шардов до выбрасывания исключения, иначе
+        они остались бы в каналах и были бы приняты следующими вызовами.
+        """
+        results = [self._connections[shard].recv() for shard in shards]
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    def _broadcast(self, method: str, *args) -> list:
+        for connection in self._connections:
+            connection.send((method, args))
+        return self._receive(range(self.shards))
+
+    def _scatter(self, method: str, groups: dict[int, list]) -> dict:
+        for shard, items in groups.items():
+            self._connections[shard].send((method, (items,)))
+        return dict(zip(groups, self._receive(groups)))
+
+    def _broadcast_path(self, method: str, path: str, *args) -> list:
+        """Вызывает метод у всех шардов, передавая каждому свой файл."""
+        for shard, connection in enumerate(self._connections):
+            connection.send((method, (f"{path}.{shard}", *args)))
+        return self._receive(range(self.shards))
+
+    def _group(self, keys: Iterable[str]) -> dict[int, list]:
+        groups: dict[int, list] = {}
+        for key in keys:
+            groups.setdefault(self.shard_for(key), []).append(key)
+        return groups
+
+    def begin_transaction(self) -> None:
+        """Начинает новую транзакцию на всех шардах."""
+        self._broadcast("begin_transaction")
+        self.transaction_stack.append(None)
+
+    def rollback_transaction(self) -> bool:
+        """Делает роллбэк текущей транзакции на всех шардах."""
+        if not self.transaction_stack:
+            return False
+        self._broadcast("rollback_transaction")
+        self.transaction_stack.pop()
+        return True
+
+    def commit_transaction(self) -> bool:
+        """Делает коммит текущей транзакции на всех шардах."""
+        if not self.transaction_stack:
+            return False
+        self._broadcast("commit_transaction")
+        self.transaction_stack.pop()
+        return True
+
+    def set_value(
+        self, key: str, value: str, ttl: float | None = None
+    ) -> None:
+        """Добавляет запись в шард, владеющий ключом."""
+        self._call(self.shard_for(key), "set_value", key, value, ttl)
+
+    def get_value(self, key: str) -> str:
+        """Получает значение переменной или NULL при отсутствии."""
+        return self._call(self.shard_for(key), "get_value", key)
+
+    def unset_value(self, key: str) -> None:
+        """Удаляет запись из шарда, владеющего ключом."""
+        self._call(self.shard_for(key), "unset_value", key)
+
+    def set_values(self, items: Iterable[tuple[str, str]]) -> None:
+        """Добавляет несколько записей, по одному вызову на шард."""
+        groups: dict[int, list] = {}
+        for key, value in items:
+            groups.setdefault(self.shard_for(key), []).append((key, value))
+        self._scatter("set_values", groups)
+
+    def get_values(self, keys: Iterable[str]) -> list[str]:
+        """Получает значения нескольких переменных."""
+        keys = list(keys)
+        groups = self._group(keys)
+        results = {
+            shard: iter(values)
+            for shard, values in self._scatter("get_values", groups).items()
+        }
+        return [next(results[self.shard_for(key)]) for key in keys]
+
+    def unset_values(self, keys: Iterable[str]) -> None:
+        """Удаляет несколько записей, по одному вызову на шард."""
+        self._scatter("unset_values", self._group(keys))
+
+    def incr_by(self, key: str, amount: int) -> int:
+        """Увеличивает целое значение ключа в шарде, владеющем ключом."""
+        return self._call(self.shard_for(key), "incr_by", key, amount)
+
+    def expire(self, key: str, seconds: float) -> bool:
+        """Задаёт срок жизни ключа в секундах."""
+        return self._call(self.shard_for(key), "expire", key, seconds)
+
+    def ttl(self, key: str) -> int:
+        """Возвращает оставшийся срок жизни ключа в секундах."""
+        return self._call(self.shard_for(key), "ttl", key)
+
+    def scan(
+        self, cursor: int = 0, count: int = 10, value: str | None = None
+    ) -> tuple[int, list[str]]:
+        """Возвращает порцию ключей, перечисляя шарды по очереди.
+
+        Курсор кодирует номер шарда и курсор внутри него.
+        """
+        shard = cursor % self.shards
+        cursor, keys = self._call(
+            shard, "scan", cursor // self.shards, count, value
+        )
+        if cursor:
+            return cursor * self.shards + shard, keys
+        if shard + 1 < self.shards:
+            return shard + 1, keys
+        return 0, keys
+
+    def count_value(self, value: str) -> int:
+        """Выводит количество, сколько раз значение встречается в базе."""
+        return sum(self._broadcast("count_value", value))
+
+    def find_keys(self, value: str) -> set[str]:
+        """Выводит все переменные с заданным значением."""
+        return set().union(*self._broadcast("find_keys", value))
+
+    def range_keys(
+        self, start: str, end: str | None = None, limit: int | None = None
+    ) -> list[str]:
+        """Возвращает до limit ключей от start до end включительно,
+        объединяя упорядоченные ответы шардов.
+        """
+        pages = self._broadcast("range_keys", start, end, limit)
+        return list(islice(heapq.merge(*pages), limit))
+
+    def prefix_keys(self, prefix: str, limit: int | None = None) -> list[str]:
+        """Возвращает по возрастанию до limit ключей с префиксом."""
+        pages = self._broadcast("prefix_keys", prefix, limit)
+        return list(islice(heapq.merge(*pages), limit))
+
+    def count_prefix(self, prefix: str) -> int:
+        """Выводит количество ключей с префиксом."""
+        return sum(self._broadcast("count_prefix", prefix))
+
+    def info(self) -> dict[str, int | str]:
+        """Возвращает сведения шардов, суммируя числовые показатели."""
+        infos = self._broadcast("info")
+        return {
+            name: (
+                sum(info[name] for info in infos)
+                if isinstance(value, int)
+                else value
+            )
+            for name, value in infos[0].items()
+        }
+
+    def load_snapshot(self, path: str) -> None:
+        """Загружает в каждый шард его файл снимка."""
+        self._broadcast_path("load_snapshot", path)
+        self.snapshot_path = path
+
+    def save_snapshot(
+        self, path: str | None = None, background: bool = False
+    ) -> bool:
+        """Сохраняет снимки всех шардов в файлы path.0, path.1, ...
+
+        Возвращает False, если путь не задан или снимок ещё пишется.
+        """
+        path = path or self.snapshot_path
+        if path is None or self.snapshot_in_progress():
+            return False
+        return all(self._broadcast_path("save_snapshot", path, background))
+
+    def snapshot_in_progress(self) -> bool:
+        """Проверяет, пишет ли какой-либо шард снимок в фоновом режиме."""
+        return any(self._broadcast("snapshot_in_progress"))
+
+    def wait_snapshot(self) -> None:
+        """Дожидается завершения фоновой записи снимков шардов."""
+        self._broadcast("wait_snapshot")
@@ -0,0 +1,148 @@
+import mmap
+import os
+import struct
+from array import array
+from itertools import accumulate
+
+MAGIC = b"IMDBSNP2"
+# Снимки прежнего формата, без сроков жизни ключей.
+MAGIC_V1 = b"IMDBSNP1"
+
+_COUNTS = struct.Struct("<II")
+_LENGTH = struct.Struct("<I")
+
+
+def _pack_array(values: list[int]) -> bytes:
+    packed = array("I", values)
+    if packed.itemsize != 4:
+        packed = array("L", values)
+    return packed.tobytes()
+
+
+def _unpack_array(buffer: memoryview, count: int) -> array:
+    unpacked = array("I")
+    if unpacked.itemsize != 4:
+        unpacked = array("L")
+    unpacked.frombytes(buffer[:count * 4])
+    return unpacked
+
+
+def write_snapshot(
+    path: str,
+    data: dict[str, str],
+    deadlines: dict[str, float] | None = None,
+) -> None:
+    """Записывает снимок данных и сроков жизни ключей в файл.
+
+    Ключи группируются по значениям, чтобы при загрузке словарь и
+    обратный индекс строились целыми группами. Формат (little-endian):
+    сигнатура, число значений и ключей, таблица различных значений
+    (длина в байтах, байты и число ключей с этим значением), число
+    ключей со сроком жизни, их номера в порядке групп и сроки по
+    time.time() (double), длины ключей в символах и все ключи одним
+    блоком UTF-8 в порядке групп.
+    Файл сначала пишется во временный и затем атомарно переименовывается.
+    """
+    groups: dict[str, list[str]] = {}
+    for key, value in data.items():
+        keys = groups.get(value)
+        if keys is None:
+            groups[value] = [key]
+        else:
+            keys.append(key)
+    parts = [MAGIC, _COUNTS.pack(len(groups), len(data))]
+    ordered_keys: list[str] = []
+    for value, keys in groups.items():
+        encoded = value.encode()
+        parts.append(_LENGTH.pack(len(encoded)))
+        parts.append(encoded)
+        parts.append(_LENGTH.pack(len(keys)))
+        ordered_keys.extend(keys)
+    positions = []
+    walls = array("d")
+    if deadlines:
+        for position, key in enumerate(ordered_keys):
+            wall = deadlines.get(key)
+            if wall is not None:
+                positions.append(position)
+                walls.append(wall)
+    parts.append(_LENGTH.pack(len(positions)))
+    parts.append(_pack_array(positions))
+    parts.append(walls.tobytes())
+    parts.append(_pack_array([len(key) for key in ordered_keys]))
+    parts.append("".join(ordered_keys).encode())
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as snapshot_file:
+        snapshot_file.writelines(parts)
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+    os.replace(temp_path, path)
+
+
+def read_snapshot(
+    path: str,
+) -> tuple[dict[str, str], dict[str, set[str]], dict[str, float]]:
+    """Читает снимок, отображая файл в память.
+
+    Возвращает данные, обратный индекс (значение -> ключи), который
+    строится за один проход по группам ключей, и сроки жизни ключей
+    по time.time(). Одинаковые значения разделяют один объект строки.
+    """
+    with open(path, "rb") as snapshot_file:
+        if os.fstat(snapshot_file.fileno()).st_size == 0:
+            raise ValueError(f"Empty snapshot: {path}")
+        with mmap.mmap(
+            snapshot_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped:
+            buffer = memoryview(mapped)
+            try:
+                return _parse(buffer, path)
+            finally:
+                buffer.release()
+
+
+def _parse(
+    buffer: memoryview, path: str
+) -> tuple[dict[str, str], dict[str, set[str]], dict[str, float]]:
+    magic = bytes(buffer[:len(MAGIC)])
+    if magic not in (MAGIC, MAGIC_V1):
+        raise ValueError(f"Not a snapshot file: {path}")
+    offset = len(MAGIC)
+    value_count, key_count = _COUNTS.unpack_from(buffer, offset)
+    offset += _COUNTS.size
+    values = []
+    group_sizes = []
+    for _ in range(value_count):
+        (length,) = _LENGTH.unpack_from(buffer, offset)
+        offset += _LENGTH.size
+        values.append(str(buffer[offset:offset + length], "utf-8"))
+        offset += length
+        (size,) = _LENGTH.unpack_from(buffer, offset)
+        offset += _LENGTH.size
+        group_sizes.append(size)
+    positions = array("I")
+    walls = array("d")
+    if magic == MAGIC:
+        (deadline_count,) = _LENGTH.unpack_from(buffer, offset)
+        offset += _LENGTH.size
+        positions = _unpack_array(buffer[offset:], deadline_count)
+        offset += deadline_count * 4
+        walls.frombytes(buffer[offset:offset + deadline_count * 8])
+        offset += deadline_count * 8
+    key_lengths = _unpack_array(buffer[offset:], key_count)
+    offset += key_count * 4
+    text = str(buffer[offset:], "utf-8")
+    ends = accumulate(key_lengths)
+    keys = [text[end - length:end] for end, length in zip(ends, key_lengths)]
+    data: dict[str, str] = {}
+    index: dict[str, set[str]] = {}
+    start = 0
+    for value, size in zip(values, group_sizes):
+        group = keys[start:start + size]
+        start += size
+        data.update(dict.fromkeys(group, value))
+        index[value] = set(group)
+    deadlines = {
+        keys[position]: wall for position, wall in zip(positions, walls)
+    }
+    return data, index, deadlines
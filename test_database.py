@@ -1,7 +1,9 @@
+import sys
+
 import pytest
 
 from database import Database
-from commands import process_command
+from commands import CommandFactory, process_command, process_commands
 
 
 @pytest.fixture
@@ -54,6 +56,90 @@ class TestDatabase:
         assert db_with_data.find_keys("20") == {"B"}
         assert db_with_data.find_keys("30") == set()
 
+    def test_multiple_keys(self, db_with_data: Database):
+        """Тестирование операций над несколькими ключами."""
+        db_with_data.set_values([("D", "10"), ("A", "20")])
+        assert db_with_data.get_values(["A", "D", "E"]) == ["20", "10", "NULL"]
+        db_with_data.begin_transaction()
+        db_with_data.unset_values(["A", "C"])
+        db_with_data.set_values([("E", "20"), ("C", "20")])
+        assert db_with_data.get_values(["A", "C", "E"]) == ["NULL", "20", "20"]
+        assert db_with_data.find_keys("20") == {"B", "C", "E"}
+        assert db_with_data.rollback_transaction()
+        assert db_with_data.find_keys("10") == {"C", "D"}
+        db_with_data.unset_values(["B", "C", "D"])
+        assert db_with_data.data == {"A": "20"}
+
+    def test_intern_values(self):
+        """Тестирование хранения одинаковых значений одним объектом."""
+        db = Database(intern_values=True)
+        first, second = "SET A value10 B value10".split()[2::2]
+        assert first is not second
+        db.set_value("A", first)
+        db.begin_transaction()
+        db.set_value("B", second)
+        db.commit_transaction()
+        assert db.data["A"] is db.data["B"]
+        assert db.find_keys("value10") == {"A", "B"}
+        stored = next(value for value in db._index if value == "value10")
+        assert stored is db.data["A"]
+
+    def test_intern_values_released(self):
+        """Тестирование освобождения значений, которых больше нет в базе."""
+        db = Database(intern_values=True)
+        first = "".join(["value", "1"])
+        refs = sys.getrefcount(first)
+        db.set_value("A", first)
+        db.set_value("B", "".join(["value", "1"]))
+        assert db.data["B"] is first
+        db.set_value("A", "2")
+        db.unset_value("B")
+        assert "value1" not in db._index
+        assert sys.getrefcount(first) == refs
+
+    def test_iter_keys(self, db_with_data: Database):
+        """Тестирование перечисления ключей без копирования индекса."""
+        assert sorted(db_with_data.iter_keys("10")) == ["A", "C"]
+        db_with_data.begin_transaction()
+        db_with_data.set_value("B", "10")
+        db_with_data.unset_value("A")
+        db_with_data.set_value("D", "30")
+        assert sorted(db_with_data.iter_keys("10")) == ["B", "C"]
+        assert sorted(db_with_data.iter_keys()) == ["B", "C", "D"]
+        assert list(db_with_data.iter_keys("20")) == []
+
+    def test_scan(self, db: Database):
+        """Тестирование постраничного перечисления ключей."""
+        for i in range(25):
+            db.set_value(f"K{i}", str(i % 2))
+        cursor, page = db.scan(0, 5, "0")
+        keys = list(page)
+        while cursor:
+            cursor, page = db.scan(cursor, 5, "0")
+            keys.extend(page)
+        assert sorted(keys) == sorted(f"K{i}" for i in range(0, 25, 2))
+        cursor, page = db.scan(0, 100)
+        assert cursor == 0
+        assert len(page) == 25
+        with pytest.raises(KeyError):
+            db.scan(12345)
+
+    def test_scan_invalidated_by_changes(self, db: Database):
+        """Тестирование недействительности курсора после изменений."""
+        for i in range(25):
+            db.set_value(f"K{i}", "0")
+        cursor, _ = db.scan(0, 10)
+        db.get_value("K0")
+        cursor, _ = db.scan(cursor, 10)
+        db.set_value("K1", "1")
+        with pytest.raises(KeyError):
+            db.scan(cursor, 10)
+        cursor, _ = db.scan(0, 10, "0")
+        db.begin_transaction()
+        db.set_value("X", "0")
+        with pytest.raises(KeyError):
+            db.scan(cursor, 10, "0")
+
     def test_begin_transaction(self, db: Database):
         """Тестирование начала транзакции."""
         db.begin_transaction()
@@ -131,6 +217,21 @@ class TestDatabase:
         db.unset_value("B")
         assert db._current_state() == {"A": "30", "C": "40"}
 
+    def test_current_state_view(self, db: Database):
+        """Тестирование представления состояния без копирования данных."""
+        db.set_values([("A", "10"), ("B", "20")])
+        state = db._current_state()
+        db.begin_transaction()
+        db.set_value("A", "30")
+        db.unset_value("B")
+        db.set_value("C", "40")
+        assert len(state) == 2
+        assert state["A"] == "30"
+        assert "B" not in state
+        assert sorted(state.items()) == [("A", "30"), ("C", "40")]
+        db.rollback_transaction()
+        assert dict(state) == {"A": "10", "B": "20"}
+
     def test_commit_nested_transactions(self, db: Database):
         """Проверка того, что COMMIT фиксирует только внутреннюю транзакцию."""
         db.begin_transaction()
@@ -152,6 +253,114 @@ class TestDatabase:
         assert db.get_value("A") == "10"
         assert len(db.transaction_stack) == 0
 
+    def test_transaction_overlay(self, db: Database):
+        """Тестирование хранения изменений транзакции по ключам."""
+        db.set_value("A", "10")
+        db.begin_transaction()
+        for value in range(100):
+            db.set_value("A", str(value))
+        db.unset_value("B")
+        assert db.transaction_stack == [{"A": "99", "B": None}]
+        db.begin_transaction()
+        db.unset_value("A")
+        assert db.get_value("A") == "NULL"
+        assert db.rollback_transaction()
+        assert db.get_value("A") == "99"
+        assert db.rollback_transaction()
+        assert db.get_value("A") == "10"
+        assert db._pending == {}
+
+    def test_commit_merges_frames(self, db: Database):
+        """Тестирование слияния изменений при коммите вложенных транзакций."""
+        db.begin_transaction()
+        db.set_value("A", "10")
+        db.set_value("B", "20")
+        db.set_value("C", "30")
+        db.begin_transaction()
+        db.set_value("A", "40")
+        assert db.commit_transaction()
+        assert db.transaction_stack == [{"A": "40", "B": "20", "C": "30"}]
+        db.begin_transaction()
+        db.unset_value("B")
+        db.set_value("D", "50")
+        db.set_value("E", "60")
+        db.set_value("F", "70")
+        assert db.commit_transaction()
+        assert db.transaction_stack == [
+            {"A": "40", "B": None, "C": "30", "D": "50", "E": "60", "F": "70"}
+        ]
+        assert db.count_value("30") == 1
+        assert db.commit_transaction()
+        assert db.data == {
+            "A": "40", "C": "30", "D": "50", "E": "60", "F": "70"
+        }
+        assert db.find_keys("40") == {"A"}
+
+    def test_count_find_in_transactions(self, db_with_data: Database):
+        """Тестирование COUNTS и FIND с незакоммиченными изменениями."""
+        db_with_data.begin_transaction()
+        db_with_data.set_value("B", "10")
+        db_with_data.unset_value("A")
+        db_with_data.set_value("D", "10")
+        assert db_with_data.count_value("10") == 3
+        assert db_with_data.find_keys("10") == {"B", "C", "D"}
+        assert db_with_data.count_value("20") == 0
+        db_with_data.begin_transaction()
+        db_with_data.set_value("A", "10")
+        db_with_data.set_value("D", "20")
+        assert db_with_data.find_keys("10") == {"A", "B", "C"}
+        assert db_with_data.find_keys("20") == {"D"}
+        assert db_with_data.rollback_transaction()
+        assert db_with_data.find_keys("10") == {"B", "C", "D"}
+        assert db_with_data.count_value("20") == 0
+        assert db_with_data.rollback_transaction()
+        assert db_with_data.find_keys("10") == {"A", "C"}
+        assert db_with_data.find_keys("20") == {"B"}
+
+    def test_count_find_after_commit(self, db_with_data: Database):
+        """Тестирование индекса значений после фиксации транзакций."""
+        db_with_data.begin_transaction()
+        db_with_data.unset_value("C")
+        db_with_data.begin_transaction()
+        db_with_data.set_value("B", "10")
+        db_with_data.set_value("B", "30")
+        assert db_with_data.commit_transaction()
+        assert db_with_data.count_value("10") == 1
+        assert db_with_data.count_value("30") == 1
+        assert db_with_data.commit_transaction()
+        assert db_with_data.find_keys("10") == {"A"}
+        assert db_with_data.find_keys("30") == {"B"}
+        assert db_with_data.count_value("20") == 0
+        db_with_data.unset_value("A")
+        assert db_with_data.count_value("10") == 0
+        assert db_with_data._index == {"30": {"B"}}
+
+    def test_sessions(self, db_with_data: Database):
+        """Тестирование изоляции транзакций разных сессий."""
+        session = db_with_data.session()
+        session.begin_transaction()
+        session.set_value("A", "20")
+        session.unset_value("B")
+        assert session.count_value("10") == 1
+        assert db_with_data.count_value("10") == 2
+        assert db_with_data.get_value("B") == "20"
+        assert db_with_data.transaction_stack == []
+
+    def test_sessions_commit_under_transaction(self, db_with_data: Database):
+        """Тестирование COUNTS в транзакции после коммита другой сессии."""
+        session = db_with_data.session()
+        session.begin_transaction()
+        session.set_value("A", "30")
+        db_with_data.set_value("A", "20")
+        db_with_data.unset_value("C")
+        db_with_data.set_value("D", "10")
+        assert session.find_keys("10") == {"D"}
+        assert session.find_keys("20") == {"B"}
+        assert session.find_keys("30") == {"A"}
+        assert session.rollback_transaction()
+        assert session.find_keys("20") == {"A", "B"}
+        assert session.count_value("10") == 1
+
 
 class TestIntegration:
     """Интеграционные тесты для проверки полных сценариев использования."""
@@ -214,6 +423,64 @@ class TestIntegration:
         assert process_command(db, "GET B") == "NULL"
         assert process_command(db, "GET C") == "NULL"
 
+    def test_process_commands(self, db: Database):
+        """Тестирование пакетной обработки команд."""
+        lines = [
+            "SET A 10\n",
+            "SET B 10",
+            "",
+            "BEGIN",
+            "set C 10",
+            "FIND 10",
+            "ROLLBACK",
+            "COUNTS 10",
+            "ROLLBACK",
+            "FOO",
+            "END",
+            "GET A",
+        ]
+        assert list(process_commands(db, lines)) == [
+            "A B C", "2", "NO TRANSACTION", "UNKNOWN COMMAND: FOO"
+        ]
+
+    def test_counters(self, db: Database):
+        """Тестирование команд INCR, DECR и INCRBY."""
+        assert process_command(db, "INCR A") == "1"
+        assert process_command(db, "INCRBY A 9") == "10"
+        assert process_command(db, "SET B 10") is None
+        assert process_command(db, "COUNTS 10") == "2"
+        process_command(db, "BEGIN")
+        assert process_command(db, "DECR A") == "9"
+        assert process_command(db, "INCRBY B -20") == "-10"
+        assert process_command(db, "FIND 10") == ""
+        process_command(db, "ROLLBACK")
+        assert process_command(db, "FIND 10") == "A B"
+        process_command(db, "BEGIN")
+        process_command(db, "INCR A")
+        process_command(db, "COMMIT")
+        assert process_command(db, "GET A") == "11"
+
+    def test_prefix_commands(self, db: Database):
+        """Тестирование команд KEYS, RANGE и COUNTPREFIX."""
+        process_command(
+            db, "MSET user:1 a user:2 b user:10 c usr x group:1 y"
+        )
+        assert process_command(db, "KEYS user:") == "user:1 user:10 user:2"
+        assert process_command(db, "COUNTPREFIX user:") == "3"
+        assert process_command(db, "RANGE group:1 user:2 LIMIT 3") == (
+            "group:1 user:1 user:10"
+        )
+        process_command(db, "BEGIN")
+        process_command(db, "UNSET user:1")
+        process_command(db, "SET user:0 z")
+        assert process_command(db, "KEYS user:") == "user:0 user:10 user:2"
+        process_command(db, "ROLLBACK")
+        assert process_command(db, "COUNTPREFIX user:") == "3"
+        assert process_command(db, "KEYS none") == ""
+        assert process_command(db, "RANGE a b LIMIT x") == (
+            "ERROR: RANGE requires START END [LIMIT N]"
+        )
+
 
 class TestEdgeCases:
     """Тесты для проверки граничных случаев и обработки ошибок."""
@@ -225,6 +492,80 @@ class TestEdgeCases:
         assert process_command(db, "FIND 10") == ""
         assert process_command(db, "UNSET A") is None
 
+    def test_multiple_keys_commands(self, db: Database):
+        """Тестирование команд MSET, MGET и MUNSET."""
+        assert process_command(db, "MSET A 10 B") == (
+            "ERROR: MSET requires KEY VALUE [KEY VALUE ...]"
+        )
+        assert process_command(db, "MGET") == (
+            "ERROR: MGET requires KEY [KEY ...]"
+        )
+        assert process_command(db, "MSET A 10 B 20 C 10") is None
+        assert process_command(db, "MGET A B D") == "10 20 NULL"
+        assert process_command(db, "MUNSET A B") is None
+        assert process_command(db, "MGET A B C") == "NULL NULL 10"
+
+    def test_scan_commands(self, db: Database):
+        """Тестирование команд FINDSCAN и SCAN."""
+        process_command(db, "MSET A 10 B 10 C 10 D 20")
+        cursor, keys = "0", []
+        while True:
+            reply = process_command(db, f"FINDSCAN 10 {cursor} COUNT 2")
+            cursor, *page = reply.split()
+            assert len(page) <= 2
+            keys.extend(page)
+            if cursor == "0":
+                break
+        assert sorted(keys) == ["A", "B", "C"]
+        assert process_command(db, "SCAN 7 COUNT 2") == "ERROR: invalid cursor"
+        assert process_command(db, "SCAN 0 LIMIT 2") == (
+            "ERROR: SCAN requires CURSOR [COUNT N]"
+        )
+        assert process_command(db, "FINDSCAN 10") == (
+            "ERROR: FINDSCAN requires VALUE CURSOR [COUNT N]"
+        )
+
+    def test_counter_errors(self, db: Database):
+        """Тестирование INCR и INCRBY для нечисловых значений."""
+        process_command(db, "MSET A abc B 010 C 1.5")
+        for key in "ABC":
+            assert process_command(db, f"INCR {key}") == (
+                "ERROR: value is not an integer"
+            )
+        assert process_command(db, "MGET A B C") == "abc 010 1.5"
+        assert process_command(db, "INCRBY A x") == (
+            "ERROR: INCRBY requires KEY INCREMENT"
+        )
+        assert process_command(db, "DECR") == "ERROR: DECR requires KEY"
+
+    def test_fast_path_replies(self, db: Database):
+        """Тестирование совпадения ответов быстрого пути и execute."""
+        lines = [
+            "SET A 10", "set B 10", "Set C 20 EX 100", "SET A", "sEt D 1",
+            "GET A", "get", "GET A B", "COUNTS 10", "FIND 10", "FIND",
+            "INCR A", "incr A B", "DECR Z", "TTL C", "UNSET B",
+            "BEGIN", "BEGIN X", "ROLLBACK", "ROLLBACK", "rollback 1",
+            "END 1", "FOO", "foo bar",
+        ]
+        reference = Database()
+        for line in lines:
+            name, *args = line.split()
+            command = CommandFactory.create_command(name)
+            assert process_command(db, line) == command.execute(
+                reference, args
+            ), line
+        assert db.get_values("ABCDZ") == reference.get_values("ABCDZ")
+
+    def test_line_cache(self, db: Database):
+        """Тестирование пакетной обработки с кэшем строк."""
+        lines = [
+            "SET A 1", "INCR A", "GET A", "FOO A", "INCR A", "GET A",
+            "FOO A", "END",
+        ]
+        assert list(process_commands(db, lines, cache_size=2)) == [
+            "2", "2", "UNKNOWN COMMAND: FOO", "3", "3", "UNKNOWN COMMAND: FOO"
+        ]
+
     def test_multiple_rollbacks(self, db: Database):
         """Тестирование многократных откатов транзакций."""
         process_command(db, "BEGIN")
@@ -0,0 +1,101 @@
+import pytest
+
+from commands import process_command
+from database import Database, entry_size
+from eviction import KeySampler, LFUPolicy
+
+
+def fill(db: Database, count: int) -> None:
+    """Записывает count ключей K0, K1, ... с одинаковым значением."""
+    for i in range(count):
+        db.set_value(f"K{i}", "v")
+
+
+class TestEviction:
+    """Тесты для учёта памяти и вытеснения ключей."""
+
+    def test_memory_accounting(self):
+        """Тестирование оценки объёма данных."""
+        db = Database()
+        db.set_value("A", "10")
+        db.set_value("B", "200")
+        assert db.info()["used_memory"] == (
+            entry_size("A", "10") + entry_size("B", "200")
+        )
+        db.set_value("A", "1")
+        db.unset_value("B")
+        assert db.info()["used_memory"] == entry_size("A", "1")
+
+    def test_lru(self):
+        """Тестирование вытеснения давно не использованных ключей."""
+        db = Database(maxmemory=entry_size("K0", "v") * 3, eviction="lru")
+        fill(db, 3)
+        assert db.get_value("K0") == "v"
+        db.set_value("K3", "v")
+        assert sorted(db.data) == ["K0", "K2", "K3"]
+        assert db.info()["evicted_keys"] == 1
+        assert db.count_value("v") == 3
+
+    @pytest.mark.parametrize("eviction", ["lfu", "random", "ttl"])
+    def test_memory_limit(self, eviction: str):
+        """Тестирование соблюдения предела памяти каждой политикой."""
+        limit = entry_size("K0", "v") * 10
+        db = Database(maxmemory=limit, eviction=eviction)
+        fill(db, 100)
+        assert db.info()["used_memory"] <= limit
+        assert len(db.data) >= 9
+        assert db.count_value("v") == len(db.data)
+
+    def test_ttl_first(self):
+        """Тестирование вытеснения ключей с ближайшим сроком жизни."""
+        db = Database(maxmemory=entry_size("K0", "v") * 3, eviction="ttl")
+        db.set_value("K0", "v")
+        db.set_value("K1", "v", ttl=100)
+        db.set_value("K2", "v", ttl=50)
+        db.set_value("K3", "v")
+        assert sorted(db.data) == ["K0", "K1", "K3"]
+
+    def test_lfu_keeps_frequent_keys(self):
+        """Тестирование того, что LFU сохраняет часто читаемые ключи."""
+        db = Database(maxmemory=entry_size("K0", "v") * 10, eviction="lfu")
+        db.set_value("hot", "v")
+        for i in range(200):
+            db.get_value("hot")
+            db.set_value(f"K{i}", "v")
+        assert db.get_value("hot") == "v"
+
+    def test_lfu_counter(self):
+        """Тестирование логарифмического счётчика обращений."""
+        policy = LFUPolicy()
+        policy.added("A")
+        policy.added("B")
+        for _ in range(1000):
+            policy.accessed("A")
+        assert policy._counters["A"] > policy._counters["B"]
+
+    def test_key_sampler(self):
+        """Тестирование множества ключей со случайным выбором."""
+        sampler = KeySampler()
+        for key in "ABC":
+            sampler.add(key)
+        sampler.remove("A")
+        sampler.remove("D")
+        assert len(sampler) == 2
+        assert {sampler.choice() for _ in range(100)} == {"B", "C"}
+
+    def test_unknown_policy(self):
+        """Тестирование ошибки при неизвестной политике вытеснения."""
+        with pytest.raises(ValueError):
+            Database(maxmemory=100, eviction="fifo")
+
+    def test_info_command(self):
+        """Тестирование команды INFO."""
+        db = Database()
+        process_command(db, "SET A 10")
+        process_command(db, "GET A")
+        process_command(db, "GET B")
+        assert process_command(db, "INFO") == (
+            f"keys:1 used_memory:{entry_size('A', '10')} maxmemory:0 "
+            "eviction:lru evicted_keys:0 expiring_keys:0 "
+            "keyspace_hits:1 keyspace_misses:1"
+        )
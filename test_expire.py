@@ -0,0 +1,159 @@
+import pytest
+
+from commands import process_command
+from database import Database
+
+
+class FakeClock:
+    """Управляемые часы для проверки сроков жизни."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Фикстура, создающая управляемые часы."""
+    return FakeClock()
+
+
+@pytest.fixture
+def db(clock: FakeClock) -> Database:
+    """Фикстура, создающая базу данных с управляемыми часами."""
+    db = Database()
+    db.clock = clock
+    return db
+
+
+class TestExpire:
+    """Тесты для сроков жизни ключей."""
+
+    def test_lazy_expire(self, db: Database, clock: FakeClock):
+        """Тестирование удаления истёкшего ключа при чтении."""
+        db.set_value("A", "10", ttl=5)
+        assert db.ttl("A") == 5
+        clock.now += 4
+        assert db.get_value("A") == "10"
+        clock.now += 1
+        assert db.get_value("A") == "NULL"
+        assert db.data == {}
+        assert db.ttl("A") == -2
+
+    def test_lazy_expire_many(self, db: Database, clock: FakeClock):
+        """Тестирование того, что MGET удаляет только запрошенные ключи."""
+        for i in range(100):
+            db.set_value(f"K{i}", "10", ttl=5)
+        db.set_value("A", "10")
+        clock.now += 5
+        assert db.get_values(["K0", "A", "B"]) == ["NULL", "10", "NULL"]
+        assert len(db.data) == 100
+        assert db.count_value("10") == 1
+
+    def test_counts_skip_expired(self, db: Database, clock: FakeClock):
+        """Тестирование того, что истёкшие ключи не попадают в COUNTS/FIND."""
+        db.set_value("A", "10", ttl=5)
+        db.set_value("B", "10")
+        db.set_value("C", "10")
+        assert db.expire("C", 10)
+        assert db.count_value("10") == 3
+        clock.now += 5
+        assert db.count_value("10") == 2
+        assert db.find_keys("10") == {"B", "C"}
+        clock.now += 5
+        assert db.find_keys("10") == {"B"}
+
+    def test_set_clears_ttl(self, db: Database):
+        """Тестирование сброса срока жизни при перезаписи."""
+        db.set_value("A", "10", ttl=5)
+        db.set_value("A", "10")
+        assert db.ttl("A") == -1
+        assert not db.expire("B", 5)
+        assert db.expire("A", 0)
+        assert db.get_value("A") == "NULL"
+
+    def test_expire_cycle(self, db: Database, clock: FakeClock):
+        """Тестирование активного удаления истёкших ключей."""
+        for i in range(100):
+            db.set_value(f"K{i}", "10", ttl=1 + i % 2)
+        clock.now += 1
+        assert db.expire_cycle(budget=1) == 50
+        assert len(db.data) == 50
+        assert db.expire_cycle(budget=1) == 0
+
+    def test_transaction_ttl(self, db: Database, clock: FakeClock):
+        """Тестирование сроков жизни, заданных в транзакции."""
+        db.set_value("A", "10")
+        db.begin_transaction()
+        assert db.expire("A", 5)
+        assert db.ttl("A") == 5
+        db.begin_transaction()
+        db.set_value("A", "20")
+        assert db.ttl("A") == -1
+        db.set_value("B", "20", ttl=10)
+        assert db.rollback_transaction()
+        assert db.ttl("B") == -2
+        db.begin_transaction()
+        db.set_value("C", "20", ttl=10)
+        assert db.commit_transaction()
+        assert db.ttl("A") == 5
+        assert db._expires == {}
+        assert db.commit_transaction()
+        assert db.ttl("A") == 5
+        assert db.ttl("C") == 10
+        clock.now += 5
+        assert db.find_keys("10") == set()
+        assert db.find_keys("20") == {"C"}
+
+    def test_transaction_over_expired_key(
+        self, db: Database, clock: FakeClock
+    ):
+        """Тестирование истечения ключа, перекрытого транзакцией."""
+        db.set_value("A", "10", ttl=5)
+        db.begin_transaction()
+        db.set_value("A", "20")
+        clock.now += 5
+        assert db.count_value("10") == 0
+        assert db.count_value("20") == 1
+        assert db.rollback_transaction()
+        assert db.get_value("A") == "NULL"
+        assert db.count_value("10") == 0
+
+    def test_incr_keeps_ttl(self, db: Database, clock: FakeClock):
+        """Тестирование сохранения срока жизни при INCR."""
+        db.set_value("A", "1", ttl=10)
+        assert db.incr_by("A", 1) == 2
+        assert db.ttl("A") == 10
+        db.begin_transaction()
+        db.expire("A", 20)
+        db.incr_by("A", 1)
+        db.commit_transaction()
+        assert db.ttl("A") == 20
+        clock.now += 20
+        assert db.incr_by("A", 1) == 1
+        assert db.ttl("A") == -1
+
+    def test_commands(self, db: Database, clock: FakeClock):
+        """Тестирование команд SET EX, EXPIRE и TTL."""
+        assert process_command(db, "SET A 10 EX 5") is None
+        assert process_command(db, "SET A 10 EX soon") == (
+            "ERROR: SET requires KEY VALUE [EX SECONDS]"
+        )
+        assert process_command(db, "SET A 10 EX 0") == (
+            "ERROR: invalid expire time in SET"
+        )
+        huge = "9" * 400
+        assert process_command(db, f"SET A 10 EX {huge}") == (
+            "ERROR: invalid expire time in SET"
+        )
+        assert process_command(db, "TTL A") == "5"
+        assert process_command(db, f"EXPIRE A {huge}") == (
+            "ERROR: invalid expire time in EXPIRE"
+        )
+        assert process_command(db, "EXPIRE A 20") == "1"
+        assert process_command(db, "EXPIRE B 20") == "0"
+        assert process_command(db, "TTL B") == "-2"
+        clock.now += 20
+        assert process_command(db, "GET A") == "NULL"
@@ -0,0 +1,103 @@
+from commands import process_command, process_commands
+from database import Database
+from metrics import LatencyHistogram, Metrics
+
+
+class TestMetrics:
+    """Тесты для метрик команд, STATS и SLOWLOG."""
+
+    def test_disabled_by_default(self):
+        """Тестирование отсутствия замеров при выключенных метриках."""
+        db = Database()
+        process_command(db, "SET A 10")
+        assert db.metrics.commands == {}
+        assert process_command(db, "STATS SET") == ""
+
+    def test_command_stats(self):
+        """Тестирование счётчиков вызовов команд."""
+        db = Database()
+        db.metrics.enabled = True
+        process_command(db, "SET A 10")
+        process_command(db, "get A")
+        list(process_commands(db, ["GET A", "NOPE"]))
+        summary = db.metrics.summary()
+        assert summary["SET"]["calls"] == 1
+        assert summary["GET"]["calls"] == 2
+        assert summary["UNKNOWN"]["calls"] == 1
+        reply = process_command(db, "STATS GET")
+        assert reply.startswith("cmdstat_get:calls=2,usec=")
+
+    def test_transaction_stats(self):
+        """Тестирование учёта глубины и размера транзакций."""
+        db = Database()
+        db.metrics.enabled = True
+        for line in ["BEGIN", "BEGIN", "SET A 1", "SET B 2", "ROLLBACK"]:
+            process_command(db, line)
+        fields = dict(
+            field.split(":", 1)
+            for field in process_command(db, "STATS").split()
+        )
+        assert fields["transaction_depth"] == "1"
+        assert fields["transaction_depth_max"] == "2"
+        assert fields["frame_size_max"] == "2"
+
+    def test_switch_and_reset(self):
+        """Тестирование STATS ON, OFF и RESET."""
+        db = Database()
+        process_command(db, "STATS ON")
+        assert db.metrics.enabled
+        process_command(db, "GET A")
+        process_command(db, "STATS RESET")
+        assert "GET" not in db.metrics.summary()
+        process_command(db, "STATS OFF")
+        assert not db.metrics.enabled
+        assert process_command(db, "STATS FOO BAR").startswith("ERROR")
+
+    def test_slowlog(self):
+        """Тестирование журнала медленных команд."""
+        db = Database()
+        db.metrics.enabled = True
+        db.metrics.slowlog_threshold_us = 0
+        process_command(db, "SET A 10")
+        process_command(db, "GET A")
+        entries = process_command(db, "SLOWLOG 2").split("; ")
+        assert entries[0].startswith("2:") and entries[0].endswith(":GET A")
+        assert entries[1].endswith(":SET A 10")
+        assert process_command(db, "SLOWLOG RESET") is None
+        assert process_command(db, "SLOWLOG X").startswith("ERROR")
+        assert process_command(db, "SLOWLOG -1") == (
+            "ERROR: SLOWLOG takes optional COUNT or RESET"
+        )
+        assert process_command(db, "SLOWLOG 0") == ""
+
+    def test_hooks(self):
+        """Тестирование хуков, вызываемых после каждой команды."""
+        db = Database()
+        db.metrics.enabled = True
+        calls = []
+
+        def hook(name, args, elapsed):
+            calls.append((name, args))
+
+        db.metrics.add_hook(hook)
+        process_command(db, "SET A 10")
+        db.metrics.remove_hook(hook)
+        process_command(db, "GET A")
+        assert calls == [("SET", ["A", "10"])]
+
+    def test_sessions_share_metrics(self):
+        """Тестирование общих метрик для сессий базы."""
+        db = Database()
+        db.metrics = Metrics(enabled=True)
+        process_command(db.session(), "GET A")
+        assert db.metrics.summary()["GET"]["calls"] == 1
+
+    def test_histogram_precision(self):
+        """Тестирование погрешности перцентилей гистограммы."""
+        histogram = LatencyHistogram()
+        for value in range(1, 100_001):
+            histogram.record(value)
+        for fraction in (0.5, 0.99, 0.999):
+            exact = 100_000 * fraction
+            assert exact <= histogram.percentile(fraction) <= exact * 1.07
+        assert len(histogram.counts) < 300
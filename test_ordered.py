@@ -0,0 +1,78 @@
+import random
+
+import pytest
+
+import ordered
+from database import Database
+from ordered import SortedKeys
+
+
+@pytest.fixture
+def db() -> Database:
+    """Фикстура, создающая базу данных с упорядоченным индексом ключей."""
+    return Database(ordered_keys=True)
+
+
+class TestSortedKeys:
+    """Тесты для упорядоченного множества ключей."""
+
+    def test_random_operations(self, monkeypatch):
+        """Тестирование вставки, удаления и диапазонов против множества."""
+        monkeypatch.setattr(ordered, "BLOCK_SIZE", 4)
+        rng = random.Random(0)
+        keys = SortedKeys(f"k{rng.randrange(100)}" for _ in range(30))
+        expected = set(keys.irange())
+        for _ in range(2000):
+            key = f"k{rng.randrange(100)}"
+            if rng.random() < 0.6:
+                keys.add(key)
+                expected.add(key)
+            else:
+                keys.discard(key)
+                expected.discard(key)
+            start, end = sorted(f"k{rng.randrange(100)}" for _ in range(2))
+            assert list(keys.irange(start, end)) == sorted(
+                key for key in expected if start <= key <= end
+            )
+        assert len(keys) == len(expected)
+        assert list(keys.irange()) == sorted(expected)
+
+
+class TestOrderedIndex:
+    """Тесты для запросов по упорядоченному индексу ключей."""
+
+    def test_transactions(self, db: Database):
+        """Тестирование учёта незакоммиченных изменений."""
+        db.set_values([("a:1", "x"), ("a:2", "x"), ("b:1", "x")])
+        db.begin_transaction()
+        db.unset_value("a:2")
+        db.set_value("a:3", "y")
+        db.begin_transaction()
+        db.set_value("a:0", "z")
+        assert db.prefix_keys("a:") == ["a:0", "a:1", "a:3"]
+        assert db.range_keys("a:1", "b:1", limit=2) == ["a:1", "a:3"]
+        assert db.rollback_transaction()
+        assert db.count_prefix("a:") == 2
+        assert db.commit_transaction()
+        assert db.prefix_keys("a:") == ["a:1", "a:3"]
+        assert list(db._ordered.irange()) == sorted(db.data)
+
+    def test_expire_and_eviction(self):
+        """Тестирование удаления из индекса истёкших и вытесненных ключей."""
+        db = Database(maxmemory=1000, ordered_keys=True)
+        for i in range(10):
+            db.set_value(f"k{i}", "v")
+        db.set_value("t", "v", ttl=1)
+        db.clock = lambda: float("inf")
+        assert db.count_prefix("t") == 0
+        assert list(db._ordered.irange()) == sorted(db.data)
+        assert db.count_prefix("k") == len(db.data)
+
+    def test_snapshot(self, db: Database, tmp_path):
+        """Тестирование построения индекса при загрузке снимка."""
+        db.set_values([("b", "1"), ("a", "1"), ("c", "2")])
+        path = str(tmp_path / "db.snapshot")
+        db.save_snapshot(path)
+        loaded = Database(ordered_keys=True)
+        loaded.load_snapshot(path)
+        assert loaded.range_keys("a", "b") == ["a", "b"]
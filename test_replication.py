@@ -0,0 +1,225 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from database import Database
+from replication import Backlog, Primary, Replica
+
+
+async def wait_until(predicate, timeout: float = 5.0) -> None:
+    """Ждёт выполнения условия, проверяя его в цикле событий."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+class CountingReplica(Replica):
+    """Реплика, считающая полные синхронизации."""
+
+    full_syncs = 0
+
+    def _replace_data(self, data: dict[str, str]) -> None:
+        self.full_syncs += 1
+        super()._replace_data(data)
+
+
+async def start_primary(
+    db: Database, backlog_size: int = 1 << 20
+) -> tuple[Primary, asyncio.Server, int]:
+    primary = Primary(db, backlog_size)
+    server = await asyncio.start_server(
+        primary.handle_replica, "127.0.0.1", 0
+    )
+    return primary, server, server.sockets[0].getsockname()[1]
+
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestBacklog:
+    """Тесты для буфера последних записей потока."""
+
+    def test_since(self):
+        """Тестирование выдачи записей после смещения."""
+        backlog = Backlog(size=5)
+        backlog.append(b"aaa")
+        backlog.append(b"bb")
+        assert backlog.since(0) == b"aaabb"
+        assert backlog.since(3) == b"bb"
+        assert backlog.since(5) == b""
+        assert backlog.since(1) is None
+        backlog.append(b"c")
+        assert (backlog.start, backlog.end) == (3, 6)
+        assert backlog.since(0) is None
+        assert backlog.since(3) == b"bbc"
+
+
+class TestReplication:
+    """Тесты для репликации зафиксированных операций."""
+
+    def test_full_sync_and_stream(self):
+        """Тестирование начальной синхронизации и потока изменений."""
+
+        async def scenario():
+            db = Database()
+            db.set_values([("A", "1"), ("B", "2")])
+            primary, server, port = await start_primary(db)
+            replica_db = Database()
+            replica_db.set_value("STALE", "x")
+            replica = Replica(replica_db, "127.0.0.1", port)
+            task = asyncio.create_task(replica.run())
+            await asyncio.wait_for(replica.synced.wait(), 5)
+
+            db.set_value("C", "3")
+            db.unset_value("A")
+            db.begin_transaction()
+            db.set_value("B", "20")
+            db.begin_transaction()
+            db.set_value("D", "4")
+            db.commit_transaction()
+            await asyncio.sleep(0.05)
+            assert replica_db.get_value("B") == "2"
+            db.commit_transaction()
+            await wait_until(lambda: replica.offset == primary.offset)
+            assert replica_db.data == {"B": "20", "C": "3", "D": "4"}
+            assert replica_db.count_value("20") == 1
+
+            task.cancel()
+            server.close()
+            await server.wait_closed()
+
+        asyncio.run(scenario())
+
+    def test_deadlines(self):
+        """Тестирование передачи сроков жизни ключей репликам."""
+
+        async def scenario():
+            db = Database()
+            db.set_value("A", "1", ttl=100)
+            primary, server, port = await start_primary(db)
+            replica_db = Database()
+            replica = Replica(replica_db, "127.0.0.1", port)
+            task = asyncio.create_task(replica.run())
+            await asyncio.wait_for(replica.synced.wait(), 5)
+            db.set_value("B", "2", ttl=200)
+            db.expire("A", 300)
+            await wait_until(lambda: replica.offset == primary.offset)
+            assert replica_db.ttl("A") in (299, 300)
+            assert replica_db.ttl("B") in (199, 200)
+
+            task.cancel()
+            server.close()
+            await server.wait_closed()
+
+        asyncio.run(scenario())
+
+    def test_resume_from_offset(self):
+        """Тестирование продолжения потока после переподключения."""
+
+        async def scenario():
+            db = Database()
+            primary, server, port = await start_primary(db)
+            replica_db = Database()
+            replica = CountingReplica(replica_db, "127.0.0.1", port, 0.01)
+            task = asyncio.create_task(replica.run())
+            await asyncio.wait_for(replica.synced.wait(), 5)
+            db.set_value("A", "1")
+            await wait_until(lambda: replica.offset == primary.offset)
+
+            task.cancel()
+            db.set_value("B", "2")
+            db.set_value("A", "10")
+            task = asyncio.create_task(replica.run())
+            await wait_until(lambda: replica.offset == primary.offset)
+            assert replica_db.data == {"A": "10", "B": "2"}
+            assert replica.full_syncs == 1
+
+            task.cancel()
+            server.close()
+            await server.wait_closed()
+
+        asyncio.run(scenario())
+
+    def test_resync_after_backlog_overflow(self):
+        """Тестирование полной синхронизации, если записей нет в backlog."""
+
+        async def scenario():
+            db = Database()
+            primary, server, port = await start_primary(db, backlog_size=1)
+            replica_db = Database()
+            replica = CountingReplica(replica_db, "127.0.0.1", port, 0.01)
+            task = asyncio.create_task(replica.run())
+            await asyncio.wait_for(replica.synced.wait(), 5)
+
+            task.cancel()
+            for i in range(10):
+                db.set_value(f"K{i}", str(i))
+            task = asyncio.create_task(replica.run())
+            await wait_until(lambda: replica.full_syncs == 2)
+            await wait_until(lambda: replica.offset == primary.offset)
+            assert replica_db.data == db.data
+
+            task.cancel()
+            server.close()
+            await server.wait_closed()
+
+        asyncio.run(scenario())
+
+    def test_two_processes(self):
+        """Тестирование репликации между двумя процессами сервера."""
+        primary_port, replication_port, replica_port = (
+            free_port() for _ in range(3)
+        )
+        processes = [
+            subprocess.Popen([
+                sys.executable, SERVER,
+                "--port", str(primary_port),
+                "--replication-port", str(replication_port),
+            ]),
+            subprocess.Popen([
+                sys.executable, SERVER,
+                "--port", str(replica_port),
+                "--replica-of", f"127.0.0.1:{replication_port}",
+            ]),
+        ]
+
+        def send(port: int, command: str) -> str:
+            deadline = time.monotonic() + 10
+            while True:
+                try:
+                    address = ("127.0.0.1", port)
+                    connection = socket.create_connection(address)
+                    break
+                except ConnectionRefusedError:
+                    assert time.monotonic() < deadline
+                    time.sleep(0.05)
+            with connection, connection.makefile("rw") as stream:
+                stream.write(f"{command}\nEND\n")
+                stream.flush()
+                return stream.readline().rstrip("\n")
+
+        try:
+            assert send(primary_port, "MSET A 10 B 10") == "OK"
+            deadline = time.monotonic() + 10
+            while send(replica_port, "COUNTS 10") != "2":
+                assert time.monotonic() < deadline
+                time.sleep(0.05)
+            assert send(primary_port, "UNSET A") == "OK"
+            while send(replica_port, "GET A") != "NULL":
+                assert time.monotonic() < deadline
+                time.sleep(0.05)
+            assert send(replica_port, "GET B") == "10"
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait()
@@ -0,0 +1,85 @@
+import asyncio
+
+from database import Database
+from server import handle_client
+
+
+async def start_server(db: Database) -> asyncio.Server:
+    return await asyncio.start_server(
+        lambda reader, writer: handle_client(db, reader, writer),
+        "127.0.0.1",
+        0,
+    )
+
+
+class Client:
+    """Клиент для тестов, отправляющий команды по одной."""
+
+    def __init__(self, reader, writer) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, server: asyncio.Server) -> "Client":
+        port = server.sockets[0].getsockname()[1]
+        return cls(*await asyncio.open_connection("127.0.0.1", port))
+
+    async def send(self, command: str) -> str:
+        self.writer.write(f"{command}\n".encode())
+        return (await self.reader.readline()).decode().rstrip("\n")
+
+    async def close(self) -> None:
+        self.writer.write(b"END\n")
+        await self.reader.read()
+        self.writer.close()
+
+
+class TestServer:
+    """Тесты для TCP-сервера."""
+
+    def test_commands(self):
+        """Тестирование ответов сервера на команды."""
+
+        async def scenario():
+            server = await start_server(Database())
+            client = await Client.connect(server)
+            assert await client.send("GET A") == "NULL"
+            assert await client.send("SET A 10") == "OK"
+            assert await client.send("GET A") == "10"
+            assert await client.send("FIND 20") == ""
+            assert await client.send("ROLLBACK") == "NO TRANSACTION"
+            assert await client.send("FOO") == "UNKNOWN COMMAND: FOO"
+            await client.close()
+            server.close()
+            await server.wait_closed()
+
+        asyncio.run(scenario())
+
+    def test_transactions_per_connection(self):
+        """Тестирование изоляции транзакций разных подключений."""
+
+        async def scenario():
+            db = Database()
+            server = await start_server(db)
+            first = await Client.connect(server)
+            second = await Client.connect(server)
+            await first.send("SET A 10")
+            await first.send("BEGIN")
+            await first.send("SET A 20")
+            await first.send("SET B 20")
+            assert await first.send("COUNTS 20") == "2"
+            assert await second.send("GET A") == "10"
+            assert await second.send("COUNTS 20") == "0"
+            assert await second.send("COMMIT") == "NO TRANSACTION"
+            assert await first.send("COMMIT") == "OK"
+            assert await second.send("FIND 20") == "A B"
+            await second.send("BEGIN")
+            await second.send("UNSET A")
+            await second.close()
+            assert await first.send("GET A") == "20"
+            assert not db._open_sessions
+            await first.close()
+            server.close()
+            await server.wait_closed()
+
+        asyncio.run(scenario())
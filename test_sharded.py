@@ -0,0 +1,77 @@
+import pytest
+
+from commands import process_command
+import test_database
+from sharded import ShardedDatabase
+
+
+@pytest.fixture
+def db():
+    """Фикстура, создающая базу данных из трёх шардов."""
+    with ShardedDatabase(shards=3) as db:
+        yield db
+
+
+class TestShardedIntegration(test_database.TestIntegration):
+    """Интеграционные сценарии для базы данных с шардами."""
+
+
+class TestShardedEdgeCases(test_database.TestEdgeCases):
+    """Граничные случаи для базы данных с шардами."""
+
+
+class TestShardedDatabase:
+    """Тесты распределения ключей по шардам."""
+
+    def test_keys_are_distributed(self, db: ShardedDatabase):
+        """Тестирование распределения ключей и объединения результатов."""
+        for i in range(30):
+            db.set_value(f"K{i}", str(i % 2))
+        shards = {db.shard_for(f"K{i}") for i in range(30)}
+        assert shards == {0, 1, 2}
+        assert db.count_value("0") == 15
+        assert db.find_keys("1") == {f"K{i}" for i in range(1, 30, 2)}
+        assert db.info()["keys"] == 30
+
+    def test_transactions_across_shards(self, db: ShardedDatabase):
+        """Тестирование транзакций, затрагивающих несколько шардов."""
+        process_command(db, "MSET A 10 B 10 C 10 D 10")
+        process_command(db, "BEGIN")
+        process_command(db, "MUNSET A B")
+        process_command(db, "BEGIN")
+        process_command(db, "SET C 20")
+        assert process_command(db, "COUNTS 10") == "1"
+        assert process_command(db, "ROLLBACK") is None
+        assert process_command(db, "FIND 10") == "C D"
+        assert process_command(db, "COMMIT") is None
+        assert process_command(db, "MGET A B C D") == "NULL NULL 10 10"
+        assert len(db.transaction_stack) == 0
+
+    def test_snapshot(self, db: ShardedDatabase, tmp_path):
+        """Тестирование снимка базы данных с шардами."""
+        path = str(tmp_path / "db.snapshot")
+        result = process_command(db, "SNAPSHOT")
+        assert result == "ERROR: SNAPSHOT requires PATH"
+        process_command(db, "MSET A 10 B 20 C 10 D 30")
+        assert process_command(db, f"SNAPSHOT {path}") is None
+        db.wait_snapshot()
+        assert not db.snapshot_in_progress()
+        assert sorted(tmp_path.iterdir()) == [
+            tmp_path / f"db.snapshot.{shard}" for shard in range(3)
+        ]
+        with ShardedDatabase(shards=3) as restored:
+            restored.load_snapshot(path)
+            assert restored.get_values(["A", "B", "C", "D"]) == [
+                "10", "20", "10", "30"
+            ]
+            assert restored.count_value("10") == 2
+
+    def test_shard_errors(self, db: ShardedDatabase, tmp_path):
+        """Тестирование исключений, возникших в шардах."""
+        with pytest.raises(FileNotFoundError):
+            db.load_snapshot(str(tmp_path / "missing"))
+        with pytest.raises(AttributeError):
+            db._scatter("missing", db._group(["A", "B", "C"]))
+        db.set_value("A", "10")
+        assert db.get_value("A") == "10"
+        assert db.count_value("10") == 1
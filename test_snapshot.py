@@ -0,0 +1,170 @@
+import struct
+import time
+
+import pytest
+
+from commands import process_command
+from database import Database
+from main import build_parser, open_database
+from snapshot import read_snapshot, write_snapshot
+from wal import WriteAheadLog
+
+
+@pytest.fixture
+def snapshot_path(tmp_path) -> str:
+    """Фикстура, возвращающая путь к файлу снимка."""
+    return str(tmp_path / "db.snapshot")
+
+
+class TestSnapshot:
+    """Тесты для снимков базы данных."""
+
+    def test_round_trip(self, snapshot_path: str):
+        """Тестирование записи и чтения снимка."""
+        data = {"A": "10", "B": "20", "C": "10", "ключ": "значение", "": ""}
+        write_snapshot(snapshot_path, data, {"B": 1e9, "": 2e9})
+        loaded, index, deadlines = read_snapshot(snapshot_path)
+        assert loaded == data
+        assert deadlines == {"B": 1e9, "": 2e9}
+        assert index == {
+            "10": {"A", "C"}, "20": {"B"}, "значение": {"ключ"}, "": {""}
+        }
+        assert loaded["A"] is loaded["C"]
+
+    def test_empty(self, snapshot_path: str):
+        """Тестирование снимка пустой базы данных."""
+        write_snapshot(snapshot_path, {})
+        assert read_snapshot(snapshot_path) == ({}, {}, {})
+
+    def test_previous_format(self, snapshot_path: str):
+        """Тестирование чтения снимка без сроков жизни ключей."""
+        with open(snapshot_path, "wb") as snapshot_file:
+            snapshot_file.write(b"IMDBSNP1")
+            snapshot_file.write(struct.pack("<IIIsI", 1, 2, 1, b"1", 2))
+            snapshot_file.write(struct.pack("<II", 1, 1))
+            snapshot_file.write(b"AB")
+        assert read_snapshot(snapshot_path) == (
+            {"A": "1", "B": "1"}, {"1": {"A", "B"}}, {}
+        )
+
+    def test_invalid_file(self, snapshot_path: str):
+        """Тестирование ошибки при чтении файла другого формата."""
+        with open(snapshot_path, "wb") as snapshot_file:
+            snapshot_file.write(b"SET A 10\n")
+        with pytest.raises(ValueError):
+            read_snapshot(snapshot_path)
+
+    def test_committed_data_only(self, snapshot_path: str):
+        """Тестирование сохранения только зафиксированных данных."""
+        db = Database()
+        db.set_value("A", "10")
+        db.begin_transaction()
+        db.set_value("B", "20")
+        assert db.save_snapshot(snapshot_path, background=True)
+        db.wait_snapshot()
+        restored = Database()
+        restored.load_snapshot(snapshot_path)
+        assert restored.data == {"A": "10"}
+        assert restored.count_value("10") == 1
+
+    def test_snapshot_with_log(self, tmp_path, snapshot_path: str):
+        """Тестирование восстановления из снимка и хвоста журнала."""
+        wal_path = str(tmp_path / "db.wal")
+        db = Database()
+        db.snapshot_path = snapshot_path
+        db.attach_log(WriteAheadLog(wal_path))
+        db.set_value("A", "10")
+        db.set_value("B", "20")
+        assert db.save_snapshot()
+        db.unset_value("A")
+        db.set_value("C", "20")
+        db._wal.close()
+        restored = Database()
+        restored.load_snapshot(snapshot_path)
+        assert restored.data == {"A": "10", "B": "20"}
+        wal = WriteAheadLog(wal_path)
+        restored.attach_log(wal)
+        assert restored.data == {"B": "20", "C": "20"}
+        assert restored.find_keys("20") == {"B", "C"}
+        wal.close()
+
+    def test_snapshot_command(self, snapshot_path: str):
+        """Тестирование команды SNAPSHOT."""
+        db = Database()
+        assert process_command(db, "SNAPSHOT") == (
+            "ERROR: SNAPSHOT requires PATH"
+        )
+        process_command(db, "SET A 10")
+        assert process_command(db, f"SNAPSHOT {snapshot_path}") is None
+        db.wait_snapshot()
+        assert read_snapshot(snapshot_path)[0] == {"A": "10"}
+
+    def test_snapshot_to_other_path_keeps_log(
+        self, tmp_path, snapshot_path: str
+    ):
+        """Тестирование перезапуска после снимка в другой файл."""
+        argv = ["--wal", str(tmp_path / "db.wal"), "--snapshot", snapshot_path]
+        db, resources = open_database(build_parser().parse_args(argv))
+        process_command(db, "SET A 1")
+        process_command(db, "SET B 2")
+        other_path = str(tmp_path / "other.snapshot")
+        assert process_command(db, f"SNAPSHOT {other_path}") is None
+        db.wait_snapshot()
+        process_command(db, "SET C 3")
+        for resource in resources:
+            resource.close()
+        assert read_snapshot(other_path)[0] == {"A": "1", "B": "2"}
+        restored, resources = open_database(build_parser().parse_args(argv))
+        assert restored.data == {"A": "1", "B": "2", "C": "3"}
+        for resource in resources:
+            resource.close()
+
+    def test_snapshot_path_disabled(self, snapshot_path: str):
+        """Тестирование запрета пути в команде SNAPSHOT."""
+        db = Database()
+        db.snapshot_path = snapshot_path
+        session = db.session()
+        session.allow_snapshot_path = False
+        assert process_command(session, "SNAPSHOT /tmp/x.snapshot") == (
+            "ERROR: SNAPSHOT PATH is not allowed"
+        )
+        assert process_command(session, "SNAPSHOT") is None
+        db.wait_snapshot()
+        assert read_snapshot(snapshot_path)[0] == {}
+
+    def test_deadlines_after_restart(self, tmp_path, snapshot_path: str):
+        """Тестирование сроков жизни после перезапуска из снимка и журнала."""
+        argv = ["--wal", str(tmp_path / "db.wal"), "--snapshot", snapshot_path]
+        db, resources = open_database(build_parser().parse_args(argv))
+        process_command(db, "SET A 1 EX 100")
+        process_command(db, "SET B 2")
+        process_command(db, "EXPIRE B 200")
+        assert process_command(db, "SNAPSHOT") is None
+        db.wait_snapshot()
+        process_command(db, "SET C 3 EX 300")
+        process_command(db, "BEGIN")
+        process_command(db, "EXPIRE A 400")
+        process_command(db, "SET D 4 EX 500")
+        process_command(db, "COMMIT")
+        for resource in resources:
+            resource.close()
+        restored, resources = open_database(build_parser().parse_args(argv))
+        ttls = [restored.ttl(key) for key in "ABCD"]
+        assert ttls in ([400, 200, 300, 500], [399, 199, 299, 499])
+        for resource in resources:
+            resource.close()
+
+    def test_expired_while_stopped(self, tmp_path, snapshot_path: str):
+        """Тестирование ключей, срок жизни которых истёк до запуска."""
+        wal_path = str(tmp_path / "db.wal")
+        write_snapshot(snapshot_path, {"A": "1", "B": "2"}, {"A": 1.0})
+        wal = WriteAheadLog(wal_path)
+        wal.append([("C", "3", time.time() - 1), ("D", "4", time.time() + 60)])
+        wal.close()
+        argv = ["--wal", wal_path, "--snapshot", snapshot_path]
+        db, resources = open_database(build_parser().parse_args(argv))
+        assert db.get_values(["A", "B", "C", "D"]) == [
+            "NULL", "2", "NULL", "4"
+        ]
+        for resource in resources:
+            resource.close()
@@ -0,0 +1,210 @@
+import sys
+import threading
+
+import pytest
+
+from commands import process_command
+from database import TransactionConflict
+from threadsafe import ThreadSafeDatabase
+
+
+@pytest.fixture
+def db() -> ThreadSafeDatabase:
+    """Фикстура, создающая потокобезопасную базу данных."""
+    db = ThreadSafeDatabase()
+    db.set_values([("A", "10"), ("B", "10"), ("C", "20")])
+    return db
+
+
+class TestThreadSafeDatabase:
+    """Тесты для потокобезопасной базы данных."""
+
+    def test_snapshot_reads(self, db: ThreadSafeDatabase):
+        """Тестирование чтения снимка на момент начала транзакции."""
+        session = db.session()
+        session.begin_transaction()
+        session.set_value("D", "10")
+        db.set_value("A", "20")
+        db.unset_value("B")
+        db.set_value("E", "10")
+        assert session.get_value("A") == "10"
+        assert session.get_values(["B", "E"]) == ["10", "NULL"]
+        assert session.count_value("10") == 3
+        assert session.find_keys("10") == {"A", "B", "D"}
+        assert session.find_keys("20") == {"C"}
+        assert session.range_keys("B", "E") == ["B", "C", "D"]
+        assert db.find_keys("10") == {"E"}
+        assert session.commit_transaction()
+        assert session.find_keys("10") == {"D", "E"}
+        assert db._versions.history == {}
+
+    def test_commit_conflict(self, db: ThreadSafeDatabase):
+        """Тестирование отмены транзакции при конфликте записи."""
+        session = db.session()
+        session.begin_transaction()
+        session.set_value("A", "30")
+        session.begin_transaction()
+        session.set_value("B", "30")
+        db.set_value("B", "40")
+        assert session.commit_transaction()
+        with pytest.raises(TransactionConflict):
+            session.commit_transaction()
+        assert session.transaction_stack == []
+        assert db.get_values(["A", "B"]) == ["10", "40"]
+
+    def test_conflict_command(self, db: ThreadSafeDatabase):
+        """Тестирование ответа COMMIT при конфликте."""
+        session = db.session()
+        process_command(session, "BEGIN")
+        process_command(session, "SET A 30")
+        process_command(db, "SET A 40")
+        assert process_command(session, "COMMIT") == "CONFLICT"
+        assert process_command(session, "GET A") == "40"
+
+    def test_concurrent_increments(self, db: ThreadSafeDatabase):
+        """Тестирование атомарности коммитов из нескольких потоков."""
+        db.set_value("X", "0")
+
+        def increment(times: int) -> None:
+            session = db.session()
+            done = 0
+            while done < times:
+                session.begin_transaction()
+                value = int(session.get_value("X"))
+                session.set_value("X", str(value + 1))
+                try:
+                    session.commit_transaction()
+                    done += 1
+                except TransactionConflict:
+                    pass
+
+        threads = [
+            threading.Thread(target=increment, args=(200,)) for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert db.get_value("X") == "800"
+
+    def test_concurrent_incr(self, db: ThreadSafeDatabase):
+        """Тестирование атомарности INCR из нескольких потоков."""
+
+        def increment(times: int) -> None:
+            session = db.session()
+            for _ in range(times):
+                process_command(session, "INCR X")
+
+        threads = [
+            threading.Thread(target=increment, args=(500,)) for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert db.get_value("X") == "2000"
+        assert db.count_value("2000") == 1
+
+    def test_consistent_snapshot_under_writes(self, db: ThreadSafeDatabase):
+        """Тестирование согласованности снимка при параллельных записях."""
+        stop = threading.Event()
+
+        def write() -> None:
+            writer = db.session()
+            value = 0
+            while not stop.is_set():
+                value += 1
+                writer.set_values([("A", str(value)), ("B", str(value))])
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        try:
+            reader = db.session()
+            for _ in range(500):
+                reader.begin_transaction()
+                first = reader.get_value("A")
+                second = reader.get_value("B")
+                assert first == second
+                assert reader.count_value(first) == 2
+                reader.rollback_transaction()
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_history_pruned_with_overlapping_snapshots(
+        self, db: ThreadSafeDatabase
+    ):
+        """Тестирование очистки истории при перекрывающихся транзакциях."""
+        sessions = [db.session(), db.session()]
+        sessions[0].begin_transaction()
+        for i in range(2000):
+            db.set_value("X", str(i))
+            if i % 100 == 99:
+                sessions[1].begin_transaction()
+                sessions[0].rollback_transaction()
+                sessions.reverse()
+        assert len(db._versions.history.get("X", [])) <= 100
+        db.set_value("Y", "1")
+        sessions[1].begin_transaction()
+        sessions[0].rollback_transaction()
+        assert "Y" not in db._versions.history
+        db.set_value("X", "new")
+        assert sessions[1].get_value("X") == "1999"
+        sessions[1].rollback_transaction()
+        assert db._versions.history == {}
+
+    def test_snapshot_existence(self, db: ThreadSafeDatabase):
+        """Тестирование TTL, EXPIRE и INCR по снимку транзакции."""
+        session = db.session()
+        process_command(session, "BEGIN")
+        process_command(db, "SET X 5")
+        process_command(db, "UNSET A")
+        assert process_command(session, "TTL X") == "-2"
+        assert process_command(session, "EXPIRE X 10") == "0"
+        assert process_command(session, "TTL A") == "-1"
+        assert process_command(session, "INCR A") == "11"
+        assert process_command(session, "INCR X") == "1"
+        assert process_command(session, "TTL X") == "-1"
+        assert process_command(session, "COMMIT") == "CONFLICT"
+        assert db.get_values(["A", "X"]) == ["NULL", "5"]
+
+    @pytest.mark.parametrize("eviction", ["lru", "lfu"])
+    def test_reads_with_eviction_policy(self, eviction: str):
+        """Тестирование чтения при удалении ключей с политикой вытеснения."""
+        db = ThreadSafeDatabase(maxmemory=10**9, eviction=eviction)
+        stop = threading.Event()
+        errors = []
+
+        def write() -> None:
+            writer = db.session()
+            while not stop.is_set():
+                for i in range(50):
+                    writer.set_value(f"k{i}", "1")
+                for i in range(50):
+                    writer.unset_value(f"k{i}")
+
+        def read() -> None:
+            reader = db.session()
+            try:
+                for _ in range(1000):
+                    for i in range(50):
+                        reader.get_value(f"k{i}")
+                    reader.get_values([f"k{i}" for i in range(50)])
+            except Exception as error:
+                errors.append(error)
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        writer = threading.Thread(target=write)
+        readers = [threading.Thread(target=read) for _ in range(3)]
+        try:
+            writer.start()
+            for thread in readers:
+                thread.start()
+            for thread in readers:
+                thread.join()
+        finally:
+            stop.set()
+            writer.join()
+            sys.setswitchinterval(interval)
+        assert errors == []
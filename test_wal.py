@@ -0,0 +1,82 @@
+import pytest
+
+from database import Database
+from wal import (
+    FSYNC_ALWAYS,
+    FSYNC_INTERVAL,
+    FSYNC_NEVER,
+    WriteAheadLog,
+    read_batches,
+)
+
+
+@pytest.fixture
+def wal_path(tmp_path) -> str:
+    """Фикстура, возвращающая путь к файлу журнала."""
+    return str(tmp_path / "db.wal")
+
+
+def open_logged_database(path: str, fsync: str = FSYNC_ALWAYS):
+    """Открывает базу данных, восстановленную из журнала."""
+    db = Database()
+    wal = WriteAheadLog(path, fsync, interval_ms=10)
+    for operations in wal.replay():
+        db.apply_operations(operations)
+    db.subscribe(wal.append)
+    return db, wal
+
+
+class TestWriteAheadLog:
+    """Тесты для журнала зафиксированных операций."""
+
+    @pytest.mark.parametrize(
+        "fsync", [FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER]
+    )
+    def test_replay(self, wal_path: str, fsync: str):
+        """Тестирование восстановления данных из журнала."""
+        db, wal = open_logged_database(wal_path, fsync)
+        db.set_value("A", "10")
+        db.set_value("B", "20")
+        db.unset_value("A")
+        db.set_value("C", "20")
+        wal.close()
+        db, wal = open_logged_database(wal_path, fsync)
+        assert db.data == {"B": "20", "C": "20"}
+        assert db.find_keys("20") == {"B", "C"}
+        wal.close()
+
+    def test_only_committed_operations(self, wal_path: str):
+        """Тестирование записи в журнал только зафиксированных изменений."""
+        db, wal = open_logged_database(wal_path)
+        db.begin_transaction()
+        db.set_value("A", "10")
+        db.begin_transaction()
+        db.set_value("B", "20")
+        db.rollback_transaction()
+        db.set_value("A", "30")
+        assert list(read_batches(wal_path)) == []
+        db.commit_transaction()
+        wal.close()
+        batches = [operations for _, operations in read_batches(wal_path)]
+        assert batches == [[("A", "30")]]
+
+    def test_torn_record(self, wal_path: str):
+        """Тестирование восстановления после обрыва последней записи."""
+        db, wal = open_logged_database(wal_path)
+        db.set_value("A", "10")
+        db.set_value("B", "20")
+        wal.close()
+        with open(wal_path, "r+b") as log_file:
+            log_file.truncate(log_file.seek(0, 2) - 3)
+        db, wal = open_logged_database(wal_path)
+        assert db.data == {"A": "10"}
+        db.set_value("C", "30")
+        wal.close()
+        db, wal = open_logged_database(wal_path)
+        assert db.data == {"A": "10", "C": "30"}
+        wal.close()
+
+    def test_unknown_fsync_mode(self, wal_path: str):
+        """Тестирование ошибки при неизвестном режиме fsync."""
+        with pytest.raises(ValueError):
+            WriteAheadLog(wal_path, "sometimes")
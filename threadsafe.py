@@ -0,0 +1,257 @@
+import functools
+import threading
+from collections.abc import Iterable, Iterator
+
+from database import Database, TransactionConflict
+
+
+class _VersionState:
+    """Общее для всех сессий состояние многоверсионного доступа.
+
+    Атрибуты:
+        lock: Блокировка изменений зафиксированных данных и транзакций.
+        seq: Номер последнего изменения.
+        snapshots: Начала открытых снимков (номер -> число транзакций).
+        history: Прежние значения ключей, изменённых при открытых снимках:
+            ключ -> [(номер изменения, значение до него), ...].
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+        self.seq = 0
+        self.snapshots: dict[int, int] = {}
+        self.history: dict[str, list[tuple[int, str | None]]] = {}
+
+
+def _locked(method):
+    """Выполняет метод под блокировкой и завершает номер изменения."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        state = self._versions
+        with state.lock:
+            result = method(self, *args, **kwargs)
+            state.seq += 1
+            return result
+
+    return wrapper
+
+
+class ThreadSafeDatabase(Database):
+    """
+    База данных для многопоточного использования.
+
+    Каждый поток работает со своей сессией (session()). Изменения
+    выполняются под общей блокировкой, а чтение вне транзакций её не берёт
+    (кроме базы с maxmemory, где чтение учитывает политика вытеснения).
+    Транзакция читает снимок зафиксированных данных на момент BEGIN:
+    при изменении ключа, пока открыт хотя бы один снимок, прежнее значение
+    сохраняется в истории, поэтому писатели не ждут читателей. COMMIT
+    внешней транзакции проверяет, что изменённые ею ключи никто не
+    зафиксировал после её начала, и применяет изменения атомарно,
+    иначе отменяет транзакцию и выбрасывает TransactionConflict.
+    """
+
+    def __init__(self, **options) -> None:
+        self._versions = _VersionState()
+        super().__init__(**options)
+
+    def _init_transactions(self) -> None:
+        super()._init_transactions()
+        self._snapshot_seq: int | None = None
+
+    def _release_snapshot(self) -> None:
+        state = self._versions
+        seq = self._snapshot_seq
+        if seq is None:
+            return
+        self._snapshot_seq = None
+        state.snapshots[seq] -= 1
+        if state.snapshots[seq]:
+            return
+        del state.snapshots[seq]
+        if not state.snapshots:
+            state.history.clear()
+            return
+        oldest = min(state.snapshots)
+        if oldest < seq:
+            return
+        # Изменения не позже самого раннего открытого снимка
+        # не нужны ни одному снимку.
+        for key in list(state.history):
+            entries = state.history[key]
+            if entries[-1][0] <= oldest:
+                del state.history[key]
+            elif entries[0][0] <= oldest:
+                entries[:] = [entry for entry in entries if entry[0] > oldest]
+
+    def _changed_since(self, key: str, seq: int) -> bool:
+        entries = self._versions.history.get(key)
+        return bool(entries) and entries[-1][0] > seq
+
+    def _snapshot_value(self, key: str) -> str | None:
+        """Возвращает зафиксированное значение ключа на момент снимка."""
+        value = self.data.get(key)
+        entries = self._versions.history.get(key)
+        if entries and entries[-1][0] > self._snapshot_seq:
+            for seq, old in entries:
+                if seq > self._snapshot_seq:
+                    return old
+        return value
+
+    def _exists(self, key: str) -> bool:
+        if self._snapshot_seq is None or key in self._pending:
+            return super()._exists(key)
+        return self._snapshot_value(key) is not None
+
+    def _deadline(self, key: str) -> float | None:
+        if (
+            self._snapshot_seq is not None
+            and key not in self._pending
+            and not any(key in expires for expires in self._expire_frames)
+            and self._changed_since(key, self._snapshot_seq)
+        ):
+            # Срок жизни относится к значению, зафиксированному после
+            # снимка, а сроки прежних значений в истории не хранятся.
+            return None
+        return super()._deadline(key)
+
+    @_locked
+    def abort_transactions(self) -> None:
+        self._release_snapshot()
+        super().abort_transactions()
+
+    @_locked
+    def begin_transaction(self) -> None:
+        if not self.transaction_stack:
+            state = self._versions
+            self._snapshot_seq = state.seq
+            state.snapshots[state.seq] = state.snapshots.get(state.seq, 0) + 1
+        super().begin_transaction()
+
+    @_locked
+    def rollback_transaction(self) -> bool:
+        result = super().rollback_transaction()
+        if not self.transaction_stack:
+            self._release_snapshot()
+        return result
+
+    @_locked
+    def commit_transaction(self) -> bool:
+        if len(self.transaction_stack) == 1:
+            seq = self._snapshot_seq
+            changes = self.transaction_stack[0]
+            if any(self._changed_since(key, seq) for key in changes):
+                self.abort_transactions()
+                raise TransactionConflict(
+                    "Keys were changed by a concurrent commit"
+                )
+        result = super().commit_transaction()
+        if not self.transaction_stack:
+            self._release_snapshot()
+        return result
+
+    set_value = _locked(Database.set_value)
+    unset_value = _locked(Database.unset_value)
+    expire = _locked(Database.expire)
+    incr_by = _locked(Database.incr_by)
+    apply_operations = _locked(Database.apply_operations)
+    _write_many = _locked(Database._write_many)
+    _drop_key = _locked(Database._drop_key)
+    _expire_if_due = _locked(Database._expire_if_due)
+    _expire_due = _locked(Database._expire_due)
+
+    def _checkpoint_data(
+        self, rotate_log: bool
+    ) -> tuple[dict[str, str], dict[str, float]]:
+        with self._versions.lock:
+            return super()._checkpoint_data(rotate_log)
+
+    def get_value(self, key: str) -> str:
+        if self._snapshot_seq is None or key in self._pending:
+            if self._policy is not None:
+                # Политика вытеснения учитывает чтение, изменяя свои
+                # структуры, поэтому такое чтение идёт под блокировкой.
+                with self._versions.lock:
+                    return super().get_value(key)
+            return super().get_value(key)
+        value = self._snapshot_value(key)
+        return "NULL" if value is None else value
+
+    def get_values(self, keys: Iterable[str]) -> list[str]:
+        if self._snapshot_seq is None:
+            if self._policy is not None:
+                with self._versions.lock:
+                    return super().get_values(keys)
+            return super().get_values(keys)
+        return [self.get_value(key) for key in keys]
+
+    def count_value(self, value: str) -> int:
+        with self._versions.lock:
+            count = super().count_value(value)
+            if self._snapshot_seq is not None:
+                for key, before, now in self._snapshot_changes():
+                    count += (before == value) - (now == value)
+            return count
+
+    def find_keys(self, value: str) -> set[str]:
+        with self._versions.lock:
+            keys = super().find_keys(value)
+            if self._snapshot_seq is not None:
+                for key, before, now in self._snapshot_changes():
+                    if before == value:
+                        keys.add(key)
+                    elif now == value:
+                        keys.discard(key)
+            return keys
+
+    def iter_keys(self, value: str | None = None) -> Iterator[str]:
+        if self._snapshot_seq is None:
+            return super().iter_keys(value)
+        if value is not None:
+            return iter(self.find_keys(value))
+        with self._versions.lock:
+            keys = set(super().iter_keys())
+            for key, before, now in self._snapshot_changes():
+                if before is None:
+                    keys.discard(key)
+                elif now is None:
+                    keys.add(key)
+            return iter(keys)
+
+    def iter_range(
+        self, start: str = "", end: str | None = None
+    ) -> Iterator[str]:
+        if self._snapshot_seq is None:
+            return super().iter_range(start, end)
+        with self._versions.lock:
+            keys = set(super().iter_range(start, end))
+            for key, before, now in self._snapshot_changes():
+                if key < start or (end is not None and key > end):
+                    continue
+                if before is None:
+                    keys.discard(key)
+                elif now is None:
+                    keys.add(key)
+            return iter(sorted(keys))
+
+    def _snapshot_changes(self):
+        """Перечисляет ключи, зафиксированные после начала снимка и не
+        перекрытые транзакциями сессии: (ключ, значение в снимке, текущее).
+        """
+        for key in self._versions.history:
+            if key in self._pending:
+                continue
+            if self._changed_since(key, self._snapshot_seq):
+                before = self._snapshot_value(key)
+                now = self.data.get(key)
+                if before != now:
+                    yield key, before, now
+
+    def _store(self, key: str, value: str | None) -> None:
+        state = self._versions
+        if state.snapshots:
+            old = self.data.get(key)
+            if old != value:
+                state.history.setdefault(key, []).append((state.seq + 1, old))
+        super()._store(key, value)
@@ -0,0 +1,232 @@
+import os
+import struct
+import threading
+import zlib
+from collections.abc import Iterable, Iterator
+
+FSYNC_ALWAYS = "always"
+FSYNC_INTERVAL = "interval"
+FSYNC_NEVER = "never"
+FSYNC_MODES = (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER)
+
+_RECORD_HEADER = struct.Struct("<II")
+_BATCH_HEADER = struct.Struct("<I")
+_OPERATION_HEADER = struct.Struct("<BII")
+_DEADLINE = struct.Struct("<d")
+_OP_UNSET = 0
+_OP_SET = 1
+_OP_SET_DEADLINE = 2
+
+# (ключ, значение или None) или (ключ, значение, срок жизни по time.time()).
+Operation = tuple[str, str | None] | tuple[str, str, float]
+
+
+def encode_batch(operations: Iterable[Operation]) -> bytes:
+    """Кодирует пачку операций в запись журнала.
+
+    Запись: длина и CRC32 содержимого, затем число операций и сами
+    операции (тип, длины ключа и значения, байты ключа и значения,
+    для SET со сроком жизни — срок по time.time() как double).
+    """
+    parts = []
+    count = 0
+    for operation in operations:
+        key_bytes = operation[0].encode()
+        value = operation[1]
+        if value is None:
+            parts.append(_OPERATION_HEADER.pack(_OP_UNSET, len(key_bytes), 0))
+            parts.append(key_bytes)
+        else:
+            value_bytes = value.encode()
+            op = _OP_SET if len(operation) == 2 else _OP_SET_DEADLINE
+            parts.append(
+                _OPERATION_HEADER.pack(op, len(key_bytes), len(value_bytes))
+            )
+            parts.append(key_bytes)
+            parts.append(value_bytes)
+            if op == _OP_SET_DEADLINE:
+                parts.append(_DEADLINE.pack(operation[2]))
+        count += 1
+    payload = _BATCH_HEADER.pack(count) + b"".join(parts)
+    return _RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_batch(payload: bytes | memoryview) -> list[Operation]:
+    """Декодирует содержимое записи журнала в список операций."""
+    (count,) = _BATCH_HEADER.unpack_from(payload, 0)
+    offset = _BATCH_HEADER.size
+    operations: list[Operation] = []
+    for _ in range(count):
+        op, key_len, value_len = _OPERATION_HEADER.unpack_from(
+            payload, offset
+        )
+        offset += _OPERATION_HEADER.size
+        key = bytes(payload[offset:offset + key_len]).decode()
+        offset += key_len
+        if op == _OP_UNSET:
+            operations.append((key, None))
+        else:
+            value = bytes(payload[offset:offset + value_len]).decode()
+            offset += value_len
+            if op == _OP_SET_DEADLINE:
+                (deadline,) = _DEADLINE.unpack_from(payload, offset)
+                offset += _DEADLINE.size
+                operations.append((key, value, deadline))
+            else:
+                operations.append((key, value))
+    return operations
+
+
+def decode_records(
+    content: bytes | memoryview, strict: bool = False
+) -> Iterator[tuple[int, list[Operation]]]:
+    """Декодирует записи подряд, возвращая смещение конца записи
+    и её операции.
+
+    Декодирование останавливается на первой неполной записи, а также
+    на повреждённой, если strict ложно; иначе повреждённая запись
+    вызывает ValueError.
+    """
+    offset = 0
+    while offset + _RECORD_HEADER.size <= len(content):
+        length, checksum = _RECORD_HEADER.unpack_from(content, offset)
+        start = offset + _RECORD_HEADER.size
+        end = start + length
+        if end > len(content):
+            return
+        payload = memoryview(content)[start:end]
+        if zlib.crc32(payload) != checksum:
+            if strict:
+                raise ValueError(f"Corrupted record at offset {offset}")
+            return
+        yield end, decode_batch(payload)
+        offset = end
+
+
+def read_batches(path: str) -> Iterator[tuple[int, list[Operation]]]:
+    """Читает журнал, возвращая смещение конца записи и её операции.
+
+    Чтение останавливается на первой неполной или повреждённой записи:
+    такая запись могла остаться после аварийного завершения.
+    """
+    try:
+        with open(path, "rb") as log_file:
+            content = log_file.read()
+    except FileNotFoundError:
+        return
+    yield from decode_records(content)
+
+
+class WriteAheadLog:
+    """
+    Журнал зафиксированных операций SET/UNSET, дописываемый в конец файла.
+    SET со сроком жизни хранит момент истечения по time.time().
+
+    Режимы синхронизации с диском:
+        always: fsync после каждой записи.
+        interval: fsync фоновым потоком раз в interval_ms миллисекунд
+            (групповая фиксация).
+        never: данные передаются ОС без fsync.
+
+    Перед записью снимка журнал переименовывается в сегмент path.old
+    (begin_checkpoint), а после её завершения сегмент удаляется
+    (end_checkpoint), поэтому при запуске воспроизводится только
+    хвост журнала после последнего снимка.
+
+    Атрибуты:
+        path: Путь к файлу журнала.
+        fsync: Режим синхронизации с диском.
+    """
+
+    def __init__(
+        self, path: str, fsync: str = FSYNC_ALWAYS, interval_ms: int = 1000
+    ) -> None:
+        if fsync not in FSYNC_MODES:
+            raise ValueError(f"Unknown fsync mode: {fsync}")
+        self.path = path
+        self.old_path = f"{path}.old"
+        self.fsync = fsync
+        self._interval = interval_ms / 1000
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._closed = threading.Event()
+        valid_end = 0
+        for valid_end, _ in read_batches(path):
+            pass
+        self._file = open(path, "ab")
+        if self._file.tell() != valid_end:
+            self._file.truncate(valid_end)
+        self._thread: threading.Thread | None = None
+        if fsync == FSYNC_INTERVAL:
+            self._thread = threading.Thread(
+                target=self._sync_periodically, daemon=True
+            )
+            self._thread.start()
+
+    def append(self, operations: Iterable[Operation]) -> None:
+        """Дописывает пачку операций одной записью журнала."""
+        record = encode_batch(operations)
+        with self._lock:
+            self._file.write(record)
+            if self.fsync == FSYNC_ALWAYS:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            elif self.fsync == FSYNC_NEVER:
+                self._file.flush()
+            else:
+                self._dirty = True
+
+    def replay(self) -> Iterator[list[Operation]]:
+        """Возвращает пачки операций, записанные в журнал."""
+        with self._lock:
+            self._file.flush()
+        for path in (self.old_path, self.path):
+            for _, operations in read_batches(path):
+                yield operations
+
+    def begin_checkpoint(self) -> None:
+        """Начинает новый файл журнала перед записью снимка.
+
+        Если сегмент от незавершённого снимка ещё существует,
+        журнал продолжается в текущем файле.
+        """
+        with self._lock:
+            if os.path.exists(self.old_path):
+                return
+            self._dirty = True
+            self._sync_locked()
+            self._file.close()
+            os.replace(self.path, self.old_path)
+            self._file = open(self.path, "ab")
+
+    def end_checkpoint(self) -> None:
+        """Удаляет сегмент журнала, покрытый записанным снимком."""
+        with self._lock:
+            if os.path.exists(self.old_path):
+                os.remove(self.old_path)
+
+    def sync(self) -> None:
+        """Сбрасывает накопленные записи на диск."""
+        with self._lock:
+            self._sync_locked()
+
+    def close(self) -> None:
+        """Сбрасывает записи на диск и закрывает журнал."""
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            if not self._file.closed:
+                self._dirty = True
+                self._sync_locked()
+                self._file.close()
+
+    def _sync_locked(self) -> None:
+        if self._dirty and not self._file.closed:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._dirty = False
+
+    def _sync_periodically(self) -> None:
+        while not self._closed.wait(self._interval):
+            self.sync()